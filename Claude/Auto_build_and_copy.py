@@ -16,7 +16,7 @@
 #   9. 对于每一个新创建的"发布"编号子文件夹：
 #      a. 遍历"素材"文件夹的每一个分类子目录。
 #      b. 从当前"素材"分类子目录中随机选择一张图片。
-#      c. 将选中的图片复制到当前的"发布"编号子文件夹中。
+#      c. 将选中的图片复制到当前的"发布"编号子文件夹中（预先分配文件名后多线程并行复制）。
 #  10. 记录结束时间，计算总用时。
 #  11. 输出总共复制的文件数量和总执行时间。
 #
@@ -31,17 +31,44 @@
 # - 如果目标位置已存在同名文件，脚本会自动重命名避免冲突。
 # - 请确保对"素材"文件夹有读取权限，对"发布"基础路径及其子目录有写入和创建权限。
 # - 输入的文件夹数量必须是大于0的整数。
+# - 可用 --mode link/reflink 以硬链接或写时复制克隆代替复制，不支持时自动回退为复制。
 
+import errno
+import os
 import pathlib
 import shutil
 import random
 import time
-from typing import List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Optional, Set
 import argparse
 import sys
 
-# 支持的图片格式常量
-IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif')
+try:
+    import fcntl  # 仅 POSIX 可用，用于 reflink (FICLONE)
+except ImportError:
+    fcntl = None
+
+# 支持的图片格式常量（frozenset，按扩展名做哈希查找）
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif'})
+
+# os.copy_file_range 仅在 Linux + Python 3.8 以上可用，其他平台回退到 shutil.copy2
+_HAS_COPY_FILE_RANGE = hasattr(os, 'copy_file_range')
+# Linux FICLONE ioctl 编号：让目标文件与源文件共享数据块（写时复制），Btrfs/XFS 等文件系统支持
+_FICLONE = 0x40049409
+
+# 并行复制的线程数（复制为 I/O 密集型，内核复制期间会释放 GIL）
+COPY_MAX_WORKERS = 8
+
+# 放置文件的方式：copy 复制数据；link 创建硬链接；reflink 创建写时复制的克隆。
+# link/reflink 不可用时（跨文件系统、文件系统不支持等）依次回退，最终回退到 copy。
+PLACE_MODES = ('copy', 'link', 'reflink')
+
+# 这些错误表示文件系统或内核不支持 copy_file_range（如跨文件系统），应回退到普通复制
+_COPY_FILE_RANGE_FALLBACK_ERRNOS = frozenset(
+    getattr(errno, name) for name in ('EXDEV', 'ENOSYS', 'EOPNOTSUPP', 'ENOTSUP', 'EINVAL', 'EBADF')
+    if hasattr(errno, name)
+)
 
 def get_positive_integer_input(prompt_message: str) -> int:
     """
@@ -153,7 +180,9 @@ def get_images_from_categories(source_materials_path: pathlib.Path) -> Dict[str,
     categories_images = {}
     
     try:
-        category_dirs = [d for d in source_materials_path.iterdir() if d.is_dir()]
+        # os.scandir 的 DirEntry 自带文件类型信息，判断目录/文件无需再逐个 stat
+        with os.scandir(source_materials_path) as entries:
+            category_dirs = [pathlib.Path(e.path) for e in entries if e.is_dir()]
         
         if not category_dirs:
             print(f"警告：素材文件夹 '{source_materials_path}' 中没有找到任何分类子目录。")
@@ -161,10 +190,11 @@ def get_images_from_categories(source_materials_path: pathlib.Path) -> Dict[str,
         
         for category_dir in category_dirs:
             try:
-                image_files = [
-                    f for f in category_dir.iterdir()
-                    if f.is_file() and f.suffix.lower() in IMAGE_EXTENSIONS
-                ]
+                with os.scandir(category_dir) as entries:
+                    image_files = [
+                        pathlib.Path(e.path) for e in entries
+                        if os.path.splitext(e.name)[1].lower() in IMAGE_EXTENSIONS and e.is_file()
+                    ]
                 categories_images[category_dir.name] = image_files
                 print(f"  分类 '{category_dir.name}': 找到 {len(image_files)} 张图片")
             except OSError as e:
@@ -179,40 +209,145 @@ def get_images_from_categories(source_materials_path: pathlib.Path) -> Dict[str,
     
     return categories_images
 
-def generate_unique_filename(target_dir: pathlib.Path, original_name: str) -> str:
+def copy_file_fast(src: pathlib.Path, dst: pathlib.Path) -> None:
+    """
+    复制文件内容及元数据，效果等同 shutil.copy2。
+    在支持的系统上使用 os.copy_file_range 在内核中直接复制数据，不经过用户态缓冲区；
+    不支持时回退到 shutil.copy2。
+
+    参数:
+        src (pathlib.Path): 源文件路径。
+        dst (pathlib.Path): 目标文件路径。
+    """
+    if not _HAS_COPY_FILE_RANGE:
+        shutil.copy2(src, dst)
+        return
+
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        remaining = size
+        copied_total = 0
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                copied_total += copied
+                remaining -= copied
+        except OSError as e:
+            # 尚未写入任何数据且属于"不支持"类错误时，改用普通复制
+            if copied_total or e.errno not in _COPY_FILE_RANGE_FALLBACK_ERRNOS:
+                raise
+        if copied_total < size:
+            # 不支持或提前返回 0（部分 FUSE/网络文件系统），清空目标后从头普通复制，避免留下截断的文件
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src, dst)
+
+def reflink_file(src: pathlib.Path, dst: pathlib.Path) -> bool:
+    """
+    尝试通过 FICLONE 创建 dst 作为 src 的写时复制克隆，不写入任何数据块。
+
+    返回:
+        bool: 成功返回 True；平台或文件系统不支持时返回 False（不会留下目标文件）。
+    """
+    if fcntl is None or not sys.platform.startswith('linux'):
+        return False
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+    except OSError:
+        try:
+            os.unlink(dst)
+        except OSError:
+            pass
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+def place_file(src: pathlib.Path, dst: pathlib.Path, mode: str = 'copy') -> str:
+    """
+    按指定方式把 src 放到 dst，失败时逐级回退：link -> reflink -> copy。
+
+    参数:
+        src (pathlib.Path): 源文件路径。
+        dst (pathlib.Path): 目标文件路径（调用方保证不存在）。
+        mode (str): 'copy'、'link' 或 'reflink'。
+
+    返回:
+        str: 实际使用的方式。
+    """
+    if mode == 'link':
+        try:
+            os.link(src, dst)
+            return 'link'
+        except OSError:
+            pass  # 跨文件系统 (EXDEV)、文件系统不支持等情况，继续尝试 reflink
+    if mode in ('link', 'reflink') and reflink_file(src, dst):
+        return 'reflink'
+    copy_file_fast(src, dst)
+    return 'copy'
+
+def generate_unique_filename(target_dir: pathlib.Path, original_name: str,
+                             reserved_names: Optional[Set[str]] = None) -> str:
     """
     生成唯一的文件名以避免冲突。
 
     参数:
         target_dir (pathlib.Path): 目标目录。
         original_name (str): 原始文件名。
+        reserved_names (Optional[Set[str]]): 该目录中已分配但可能尚未写入的文件名。
+            传入时，返回的文件名会被加入其中，保证并行复制前预先分配的文件名互不冲突。
 
     返回:
         str: 唯一的文件名。
     """
-    target_file = target_dir / original_name
-    if not target_file.exists():
-        return original_name
-    
-    # 如果文件已存在，添加数字后缀
-    stem = pathlib.Path(original_name).stem
-    suffix = pathlib.Path(original_name).suffix
-    counter = 1
-    
-    while True:
-        new_name = f"{stem}_{counter}{suffix}"
-        if not (target_dir / new_name).exists():
-            return new_name
-        counter += 1
+    if reserved_names is None:
+        reserved_names = set()
+
+    def is_taken(name: str) -> bool:
+        return name in reserved_names or (target_dir / name).exists()
+
+    new_name = original_name
+    if is_taken(new_name):
+        # 如果文件已存在，添加数字后缀
+        stem = pathlib.Path(original_name).stem
+        suffix = pathlib.Path(original_name).suffix
+        counter = 1
+        while True:
+            new_name = f"{stem}_{counter}{suffix}"
+            if not is_taken(new_name):
+                break
+            counter += 1
+
+    reserved_names.add(new_name)
+    return new_name
+
+def run_copy_task(task: Tuple[pathlib.Path, pathlib.Path, str]) -> Tuple[Optional[str], Optional[Exception]]:
+    """
+    执行单个复制任务 (源文件, 目标文件, 放置方式)，供线程池调用。
+
+    返回:
+        Tuple[Optional[str], Optional[Exception]]: (实际使用的方式, None) 或 (None, 异常)。
+    """
+    src, dst, mode = task
+    try:
+        return place_file(src, dst, mode), None
+    except Exception as ex:
+        return None, ex
 
 def copy_random_images_to_numbered_folders(source_materials_path: pathlib.Path, 
-                                         target_publish_base_path: pathlib.Path) -> None:
+                                         target_publish_base_path: pathlib.Path,
+                                         place_mode: str = 'copy') -> None:
     """
     将"素材"文件夹的图片随机复制到"发布"基础路径下的编号子文件夹中。
 
     参数:
         source_materials_path (pathlib.Path): "素材"文件夹的路径。
         target_publish_base_path (pathlib.Path): "发布"文件夹的基础路径。
+        place_mode (str): 放置文件的方式，见 PLACE_MODES。
     """
     print("\n--- 开始执行图片随机复制任务 ---")
     start_time = time.time()
@@ -229,10 +364,11 @@ def copy_random_images_to_numbered_folders(source_materials_path: pathlib.Path,
 
     # 2. 获取编号子文件夹
     try:
-        target_numbered_folders = [
-            d for d in target_publish_base_path.iterdir()
-            if d.is_dir() and d.name.isdigit()
-        ]
+        with os.scandir(target_publish_base_path) as entries:
+            target_numbered_folders = [
+                pathlib.Path(e.path) for e in entries
+                if e.name.isdigit() and e.is_dir()
+            ]
         target_numbered_folders.sort(key=lambda x: int(x.name))  # 按数字排序
     except OSError as e:
         print(f"错误：无法读取发布基础文件夹 '{target_publish_base_path}': {e}")
@@ -244,52 +380,78 @@ def copy_random_images_to_numbered_folders(source_materials_path: pathlib.Path,
     
     print(f"发布基础文件夹中找到 {len(target_numbered_folders)} 个编号子目录")
 
-    # 3. 执行复制操作
+    # 3. 一次性为所有编号文件夹抽取图片：每个分类调用一次 random.choices，
+    #    而不是在每个编号文件夹 × 分类的循环中逐次调用 random.choice（每次抽取仍相互独立）
+    selections = {
+        category_name: random.choices(image_list, k=len(target_numbered_folders))
+        for category_name, image_list in categories_images.items()
+        if image_list
+    }
+
+    # 4. 预先为每个复制任务分配目标文件名（需按顺序进行，保证文件名不冲突），
+    #    再交给线程池并行复制
     total_operations = len(target_numbered_folders) * len(categories_images)
-    current_operation = 0
-    
-    for target_folder in target_numbered_folders:
-        print(f"\n--- 处理编号文件夹: '{target_folder.name}' ---")
-        folder_copy_count = 0
-        
+    plan = []  # (编号文件夹, 分类名, 源图片 或 None 表示跳过, 目标文件名)
+    copy_tasks = []
+    for folder_index, target_folder in enumerate(target_numbered_folders):
+        reserved_names = set()
         for category_name, image_list in categories_images.items():
-            current_operation += 1
-            progress = (current_operation / total_operations) * 100
-            
             if not image_list:
+                plan.append((target_folder, category_name, None, None))
+                continue
+            # 取出预先随机选择的图片
+            selected_image = selections[category_name][folder_index]
+            unique_filename = generate_unique_filename(target_folder, selected_image.name, reserved_names)
+            plan.append((target_folder, category_name, selected_image, unique_filename))
+            copy_tasks.append((selected_image, target_folder / unique_filename, place_mode))
+
+    print(f"使用 {COPY_MAX_WORKERS} 个线程并行复制 {len(copy_tasks)} 个文件")
+
+    # 5. 执行复制操作：线程池按提交顺序返回结果，输出顺序与串行执行时一致
+    with ThreadPoolExecutor(max_workers=COPY_MAX_WORKERS) as executor:
+        copy_results = executor.map(run_copy_task, copy_tasks)
+
+        current_folder = None
+        folder_copy_count = 0
+        for current_operation, (target_folder, category_name, selected_image, unique_filename) in enumerate(plan, 1):
+            if target_folder != current_folder:
+                if current_folder is not None:
+                    print(f"--- 编号文件夹 '{current_folder.name}' 完成：复制了 {folder_copy_count} 个文件 ---")
+                print(f"\n--- 处理编号文件夹: '{target_folder.name}' ---")
+                current_folder = target_folder
+                folder_copy_count = 0
+
+            progress = (current_operation / total_operations) * 100
+
+            if selected_image is None:
                 print(f"  [进度: {progress:.1f}%] 跳过分类 '{category_name}': 无图片文件")
                 skipped_categories += 1
                 continue
-            
-            try:
-                # 随机选择一张图片
-                selected_image = random.choice(image_list)
-                
-                # 生成唯一文件名
-                unique_filename = generate_unique_filename(target_folder, selected_image.name)
-                target_file_path = target_folder / unique_filename
-                
-                # 执行复制
-                shutil.copy2(selected_image, target_file_path)
-                
-                # 检查文件名冲突
-                if unique_filename != selected_image.name:
-                    conflict_resolved += 1
-                    print(f"  [进度: {progress:.1f}%] 分类 '{category_name}': {selected_image.name} -> {unique_filename} (重命名)")
-                else:
-                    print(f"  [进度: {progress:.1f}%] 分类 '{category_name}': {selected_image.name}")
-                
-                total_files_copied += 1
-                folder_copy_count += 1
-                
-            except OSError as e:
-                print(f"  [进度: {progress:.1f}%] 错误: 复制 '{selected_image}' 到 '{target_folder}' 失败: {e}")
-            except Exception as ex:
-                print(f"  [进度: {progress:.1f}%] 意外错误: 处理分类 '{category_name}' 时发生错误: {ex}")
-        
-        print(f"--- 编号文件夹 '{target_folder.name}' 完成：复制了 {folder_copy_count} 个文件 ---")
+
+            used_mode, error = next(copy_results)
+            if isinstance(error, OSError):
+                print(f"  [进度: {progress:.1f}%] 错误: 复制 '{selected_image}' 到 '{target_folder}' 失败: {error}")
+                continue
+            if error is not None:
+                print(f"  [进度: {progress:.1f}%] 意外错误: 处理分类 '{category_name}' 时发生错误: {error}")
+                continue
+
+            mode_note = f" [{used_mode}]" if place_mode != 'copy' else ""
+
+            # 检查文件名冲突
+            if unique_filename != selected_image.name:
+                conflict_resolved += 1
+                print(f"  [进度: {progress:.1f}%] 分类 '{category_name}': {selected_image.name} -> {unique_filename} (重命名){mode_note}")
+            else:
+                print(f"  [进度: {progress:.1f}%] 分类 '{category_name}': {selected_image.name}{mode_note}")
+
+            total_files_copied += 1
+            folder_copy_count += 1
+
+        if current_folder is not None:
+            print(f"--- 编号文件夹 '{current_folder.name}' 完成：复制了 {folder_copy_count} 个文件 ---")
     
-    # 4. 输出统计信息
+    # 6. 输出统计信息
     end_time = time.time()
     execution_time = end_time - start_time
     
@@ -307,6 +469,12 @@ def main():
     """
     主函数：控制程序的执行流程。
     """
+    parser = argparse.ArgumentParser(description="图片文件夹自动构建和复制工具")
+    parser.add_argument('--mode', choices=PLACE_MODES, default='copy',
+                        help="放置图片的方式：copy 复制（默认）；link 硬链接；reflink 写时复制克隆。"
+                             "link/reflink 不可用时自动回退到 copy。注意硬链接与源文件共享内容，修改任一处会影响另一处。")
+    args = parser.parse_args()
+
     print("图片文件夹自动构建和复制工具")
     print("=" * 50)
     
@@ -342,13 +510,14 @@ def main():
         print(f"- 创建子文件夹数量: {num_folders}")
         print(f"- 素材文件夹路径: {source_path}")
         print(f"- 发布基础路径: {publish_base_path}")
+        print(f"- 放置方式: {args.mode}")
         
         # 4. 创建编号子文件夹
         if create_numbered_folders(publish_base_path, num_folders):
             print("\n编号子文件夹创建成功，开始复制图片...")
             
             # 5. 执行图片复制任务
-            copy_random_images_to_numbered_folders(source_path, publish_base_path)
+            copy_random_images_to_numbered_folders(source_path, publish_base_path, args.mode)
         else:
             print("\n编号子文件夹创建失败，程序终止。")
             return
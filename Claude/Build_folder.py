@@ -23,6 +23,7 @@
 # - 输入的文件夹数量必须是大于0的整数。
 # - 支持用户中断操作（Ctrl+C）优雅退出。
 
+import os
 import pathlib
 import time
 import sys
@@ -98,6 +99,11 @@ def create_folders_pathlib(base_dir: pathlib.Path, num_folders_to_create: int) -
         base_dir.mkdir(parents=True, exist_ok=True)
         print(f"基础目录 '{base_dir}' 确保存在。")
 
+        # 一次 scandir 取得基础目录中已有的子文件夹，之后只对缺失的编号调用 mkdir，
+        # 重复运行时无需为每个编号单独 stat 或触发 EEXIST
+        with os.scandir(base_dir) as entries:
+            existing_dirs = {e.name for e in entries if e.is_dir()}
+
         # 创建指定数量的子文件夹
         for i in range(1, num_folders_to_create + 1):
             folder_name = str(i)
@@ -106,10 +112,10 @@ def create_folders_pathlib(base_dir: pathlib.Path, num_folders_to_create: int) -
 
             try:
                 # 检查文件夹是否已存在
-                if folder_path.exists():
+                if folder_name in existing_dirs:
                     print(f"  [进度: {progress:.1f}%] 子文件夹 '{folder_name}' 已存在，跳过创建。")
                 else:
-                    folder_path.mkdir(exist_ok=True)
+                    os.mkdir(folder_path)
                     print(f"  [进度: {progress:.1f}%] 子文件夹 '{folder_name}' 创建成功。")
                 success_count += 1
             except OSError as e:
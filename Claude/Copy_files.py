@@ -4,7 +4,7 @@
 #
 # 工作过程:
 #   1. 记录开始时间。
-#   2. 提示用户输入"素材"文件夹路径和"发布"文件夹路径。
+#   2. 提示用户输入"素材"文件夹路径和"发布"文件夹路径（Web 环境下从标准输入按此顺序读取）。
 #   3. 校验输入的路径是否存在且为文件夹。
 #   4. 获取"素材"文件夹下的所有子目录列表（这些是图片来源的分类）。
 #   5. 获取"发布"文件夹下的所有子目录列表（这些是图片要复制到的目标位置）。
@@ -24,23 +24,34 @@
 #   脚本执行完毕后，会显示本次操作复制的总文件数和所用时间。
 #
 # 注意事项:
-#   - 脚本仅处理常见图片格式（jpg, jpeg, png, gif, webp, bmp）。如需其他格式，请修改 `image_extensions`。
+#   - 脚本仅处理常见图片格式（jpg, jpeg, png, gif, webp, bmp）。如需其他格式，请修改 `IMAGE_EXTENSIONS`。
 #   - 如果"素材"的某个子目录中没有图片文件，则在处理对应的"发布"子目录时，该素材类别将被跳过。
-#   - 如果"发布"子目录中已存在同名文件，脚本会智能处理文件名冲突，避免覆盖现有文件。
+#   - 复制后的文件名为"分类名__原文件名"；如果"发布"子目录中已存在同名文件，
+#     脚本会在提交复制任务前分配新的文件名，避免覆盖现有文件。
 #   - 脚本会打印详细的操作信息和可能的警告或错误。
 #   - 请确保对"素材"文件夹有读取权限，对"发布"文件夹及其子目录有写入权限。
 #   - 支持用户中断操作（Ctrl+C）优雅退出。
 
 import os
+import errno
+import stat
 import shutil
 import random
 import time
 import sys
+import argparse
+import logging
 from pathlib import Path
 from typing import List, Tuple, Optional
 # 添加多线程支持
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 import threading
+from itertools import chain
+
+try:
+    import fcntl  # 仅 POSIX 可用，用于 reflink (FICLONE)
+except ImportError:
+    fcntl = None
 
 # Python 3.7兼容的类型提示导入
 try:
@@ -51,10 +62,87 @@ except ImportError:
     Tuple = tuple
     Optional = type(None)
 
+# 支持的图片格式（小写，不含点；frozenset 按扩展名做哈希查找）
+IMAGE_EXTENSIONS = frozenset({'jpg', 'jpeg', 'png', 'gif', 'webp', 'bmp'})
+
+# 复制线程数：复制属于 I/O 密集型（内核拷贝期间会释放 GIL），线程数可以远多于 CPU 核数，
+# 让磁盘队列中同时有多个复制请求
+COPY_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# 每个线程任务一次处理的复制数量：小文件很多时按批提交，分摊线程池调度开销
+COPY_BATCH_SIZE = 64
+
+# Linux FICLONE ioctl 编号：让目标文件与源文件共享数据块（写时复制），Btrfs/XFS 等文件系统支持
+_FICLONE = 0x40049409
+_CAN_REFLINK = fcntl is not None and sys.platform.startswith('linux')
+# os.copy_file_range 仅在 Linux + Python 3.8 以上可用
+_HAS_COPY_FILE_RANGE = hasattr(os, 'copy_file_range')
+# posix_fadvise 仅 Linux 等 POSIX 系统可用：内核内复制前提示顺序读取并预读源文件
+_HAS_FADVISE = hasattr(os, 'posix_fadvise')
+# Linux 下 os.sendfile 支持文件到文件复制，作为 copy_file_range 之后的内核复制方式
+_CAN_SENDFILE = hasattr(os, 'sendfile') and sys.platform.startswith('linux')
+
+# 用户态读写复制时的缓冲区大小：1 MB，图片（尤其是大尺寸原图）读写次数更少。
+# Python 3.8+ 的 shutil 在无法走内核复制时按 shutil.COPY_BUFSIZE 读写，这里同步调大；
+# Python 3.7 的 shutil.copyfile 只有 16 KB 的读写循环，改用下面的 _copy_with_buffer
+COPY_BUFSIZE = 1024 * 1024
+if hasattr(shutil, 'COPY_BUFSIZE'):
+    shutil.COPY_BUFSIZE = max(shutil.COPY_BUFSIZE, COPY_BUFSIZE)
+
+# Windows 下直接调用系统 CopyFileW：由系统完成复制（ReFS 上可走块克隆、支持卸载复制），
+# 比 Python 3.7 的 copyfile 用户态读写循环快；其他平台为 None
+_WIN_COPY_FILE = None
+if sys.platform == 'win32':
+    try:
+        import ctypes
+        from ctypes import wintypes
+        _WIN_COPY_FILE = ctypes.WinDLL('kernel32', use_last_error=True).CopyFileW
+        _WIN_COPY_FILE.argtypes = (wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.BOOL)
+        _WIN_COPY_FILE.restype = wintypes.BOOL
+    except (ImportError, OSError, AttributeError):
+        _WIN_COPY_FILE = None
+
+# 这些错误表示文件系统或内核不支持 reflink / copy_file_range（如跨文件系统），应回退到下一种方式
+_FAST_COPY_FALLBACK_ERRNOS = frozenset(
+    getattr(errno, name) for name in ('EXDEV', 'ENOSYS', 'EOPNOTSUPP', 'ENOTSUP', 'EINVAL', 'EBADF', 'ENOTTY')
+    if hasattr(errno, name)
+)
+
+# 已探测为不支持的 (源设备号, 目标目录) 组合，同一组合不再重复尝试
+_reflink_unsupported = set()
+_copy_range_unsupported = set()
+_sendfile_unsupported = set()
+
+# 逐个文件的复制明细只在 --verbose 时输出（DEBUG 级别）；默认级别下 log.debug 不会格式化消息
+log = logging.getLogger(__name__)
+
 # 线程锁用于线程安全的计数器
 copy_lock = threading.Lock()
 copy_stats = {'total': 0, 'success': 0, 'failed': 0}
 
+# 每个线程独立的随机数生成器，避免多线程共用模块级 random 的全局状态
+_thread_local = threading.local()
+
+
+def _rng() -> random.Random:
+    """
+    获取当前线程的 random.Random 实例（首次使用时以 os.urandom 播种）。
+    """
+    rng = getattr(_thread_local, 'rng', None)
+    if rng is None:
+        rng = random.Random(os.urandom(8))
+        _thread_local.rng = rng
+    return rng
+
+def is_existing_directory(folder_path) -> bool:
+    """
+    用一次 os.stat 判断路径是否存在且为文件夹（exists + is_dir 需要两次 stat）。
+    """
+    try:
+        return stat.S_ISDIR(os.stat(folder_path).st_mode)
+    except (OSError, ValueError):
+        return False
+
+
 def get_valid_folder_path_from_user(prompt_message: str) -> Path:
     """
     提示用户输入一个文件夹路径，并持续请求直到输入一个有效的文件夹路径。
@@ -73,7 +161,7 @@ def get_valid_folder_path_from_user(prompt_message: str) -> Path:
                 continue
             
             folder_path = Path(folder_path_str)
-            if folder_path.exists() and folder_path.is_dir():
+            if is_existing_directory(folder_path):
                 return folder_path
             else:
                 print(f"错误：路径 '{folder_path}' 不存在或不是一个文件夹。请重新输入。")
@@ -93,13 +181,13 @@ def get_subdirectories(base_path: Path, folder_type: str):
         folder_type (str): 文件夹类型描述（用于错误提示）。
 
     返回:
-        list: 子目录名称列表。
+        list: 子目录路径列表（按名称排序）。
     """
     try:
-        subdirs = [
-            item.name for item in base_path.iterdir()
-            if item.is_dir()
-        ]
+        # os.scandir 的 DirEntry 自带文件类型信息，判断是否为目录无需再逐个 stat
+        with os.scandir(base_path) as entries:
+            subdirs = [Path(entry.path) for entry in entries if entry.is_dir(follow_symlinks=False)]
+        subdirs.sort(key=lambda p: p.name)
         return subdirs
     except OSError as e:
         print(f"错误：无法读取{folder_type}文件夹 '{base_path}' 的内容: {e}")
@@ -112,54 +200,209 @@ def get_image_files_in_directory(directory_path: Path, image_extensions):
 
     参数:
         directory_path (Path): 目录路径。
-        image_extensions: 支持的图片文件扩展名元组。
+        image_extensions: 支持的图片文件扩展名集合（小写，不含点）。
 
     返回:
-        list: 图片文件名列表。
+        list: 图片文件的 os.DirEntry 列表（路径取 entry.path，stat 结果由 DirEntry 缓存）。
     """
     try:
-        image_files = [
-            item.name for item in directory_path.iterdir()
-            if item.is_file() and item.suffix.lower() in image_extensions
-        ]
+        with os.scandir(directory_path) as entries:
+            # 扩展名判断直接内联：只截取并转小写扩展名部分再查 frozenset（实测比预编译正则和函数调用都快）；
+            # 没有点号的文件名 rpartition 后整名落在扩展名位置，用 '.' in name 排除
+            image_files = [
+                entry for entry in entries
+                if entry.name.rpartition('.')[2].lower() in image_extensions and '.' in entry.name
+                and entry.is_file(follow_symlinks=False)
+            ]
         return image_files
     except OSError as e:
         print(f"  错误: 无法读取目录 '{directory_path}' 的内容: {e}")
         return []
 
 
-def generate_unique_filename(target_path: Path, original_filename: str) -> str:
+def sample_one_image_in_directory(directory_path: Path, image_extensions):
+    """
+    边遍历目录边做蓄水池抽样（k=1），均匀随机选出一张图片，不构建完整的文件列表。
+
+    参数:
+        directory_path (Path): 目录路径。
+        image_extensions: 支持的图片文件扩展名集合（小写，不含点）。
+
+    返回:
+        os.DirEntry 或 None: 选中的图片；目录中没有图片或读取失败时返回 None。
+    """
+    chosen = None
+    seen = 0
+    rand = _rng().random
+    try:
+        with os.scandir(directory_path) as entries:
+            for entry in entries:
+                name = entry.name
+                if (name.rpartition('.')[2].lower() in image_extensions and '.' in name
+                        and entry.is_file(follow_symlinks=False)):
+                    seen += 1
+                    # 第 i 张图片以 1/i 的概率替换当前选中项，最终每张图片被选中的概率相同
+                    if rand() * seen < 1.0:
+                        chosen = entry
+    except OSError as e:
+        print(f"  错误: 无法读取目录 '{directory_path}' 的内容: {e}")
+        return None
+    return chosen
+
+
+def get_existing_names(directory_path: Path) -> set:
+    """
+    获取目录中已有的条目名称集合，用于预先分配不冲突的目标文件名。
+
+    参数:
+        directory_path (Path): 目录路径。
+
+    返回:
+        set: 条目名称集合；读取失败时返回空集合（复制时会再报告具体错误）。
+    """
+    try:
+        with os.scandir(directory_path) as entries:
+            return {entry.name for entry in entries}
+    except OSError:
+        return set()
+
+
+def generate_unique_filename(used_names: set, original_filename: str) -> str:
     """
     生成唯一的文件名，避免文件名冲突。
 
     参数:
-        target_path (Path): 目标目录路径。
+        used_names (set): 目标目录中已存在及本次已分配的文件名，返回的文件名会被加入其中。
         original_filename (str): 原始文件名。
 
     返回:
         str: 唯一的文件名。
     """
-    target_file_path = target_path / original_filename
+    new_filename = original_filename
     
-    if not target_file_path.exists():
-        return original_filename
+    if new_filename in used_names:
+        # 分离文件名和扩展名
+        file_stem, file_suffix = os.path.splitext(original_filename)
+        
+        counter = 1
+        while new_filename in used_names:
+            new_filename = f"{file_stem}_{counter}{file_suffix}"
+            counter += 1
+            
+            # 防止无限循环
+            if counter > 9999:
+                timestamp = int(time.time())
+                new_filename = f"{file_stem}_{timestamp}{file_suffix}"
+                break
     
-    # 分离文件名和扩展名
-    file_stem = Path(original_filename).stem
-    file_suffix = Path(original_filename).suffix
+    used_names.add(new_filename)
+    return new_filename
+
+
+def _copy_with_buffer(src: str, dst: str) -> None:
+    """
+    用每个线程复用的 1 MB 缓冲区做 readinto 读写复制，不为每次读取重新分配内存。
+
+    参数:
+        src (str): 源文件路径。
+        dst (str): 目标文件路径（存在时会被截断重写）。
+    """
+    buffer = getattr(_thread_local, 'copy_buffer', None)
+    if buffer is None:
+        buffer = bytearray(COPY_BUFSIZE)
+        _thread_local.copy_buffer = buffer
+    view = memoryview(buffer)
+    with open(src, 'rb', buffering=0) as fsrc, open(dst, 'wb', buffering=0) as fdst:
+        while True:
+            size = fsrc.readinto(buffer)
+            if not size:
+                break
+            # 无缓冲写入可能只写入一部分，循环直到本块写完
+            written = 0
+            while written < size:
+                written += fdst.write(view[written:size])
+
+
+# shutil 有 COPY_BUFSIZE（3.8+）时其 copyfile 会优先走 sendfile/fcopyfile 等系统复制，否则用自己的读写循环
+_fallback_copy = shutil.copyfile if hasattr(shutil, 'COPY_BUFSIZE') else _copy_with_buffer
+
+
+def _fast_copy(src: str, dst: str, size: int, probe_key: tuple) -> None:
+    """
+    复制文件内容。Windows 上使用系统 CopyFileW；其他平台依次尝试 reflink (FICLONE)、
+    os.copy_file_range、os.sendfile，最后回退到 shutil.copyfile（Python 3.7 下为 _copy_with_buffer）。
+    目标文件名由调用方预先分配，目标以独占方式创建（已存在时抛出 FileExistsError，不覆盖），
+    省去 shutil.copyfile 对目标的 stat 检查。
+
+    参数:
+        src (str): 源文件路径。
+        dst (str): 目标文件路径。
+        size (int): 源文件大小（取自 DirEntry 缓存的 stat）。
+        probe_key (tuple): (源文件设备号, 目标目录)，用于缓存该组合上各方式是否可用。
+    """
+    if _WIN_COPY_FILE is not None:
+        # 第三个参数 TRUE：目标已存在时失败而不是覆盖
+        if not _WIN_COPY_FILE(src, dst, True):
+            raise ctypes.WinError(ctypes.get_last_error())
+        return
     
-    counter = 1
-    while True:
-        new_filename = f"{file_stem}_{counter}{file_suffix}"
-        new_target_path = target_path / new_filename
-        if not new_target_path.exists():
-            return new_filename
-        counter += 1
-        
-        # 防止无限循环
-        if counter > 9999:
-            timestamp = int(time.time())
-            return f"{file_stem}_{timestamp}{file_suffix}"
+    try_reflink = _CAN_REFLINK and probe_key not in _reflink_unsupported
+    try_copy_range = _HAS_COPY_FILE_RANGE and probe_key not in _copy_range_unsupported
+    try_sendfile = _CAN_SENDFILE and probe_key not in _sendfile_unsupported
+    if try_reflink or try_copy_range or try_sendfile:
+        with open(src, 'rb') as fsrc, open(dst, 'xb') as fdst:
+            if try_reflink:
+                try:
+                    fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+                    return
+                except OSError as e:
+                    if e.errno not in _FAST_COPY_FALLBACK_ERRNOS:
+                        raise
+                    _reflink_unsupported.add(probe_key)
+            if _HAS_FADVISE and (try_copy_range or try_sendfile):
+                # 只是给内核的提示，失败不影响复制。不在复制后 DONTNEED 丢弃缓存：
+                # 任务按素材分类排列，同一张图片往往紧接着还要复制到其他发布子目录
+                try:
+                    os.posix_fadvise(fsrc.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    os.posix_fadvise(fsrc.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                except OSError:
+                    pass
+            if try_copy_range:
+                copied_total = 0
+                try:
+                    while copied_total < size:
+                        copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied_total)
+                        if copied == 0:
+                            break
+                        copied_total += copied
+                except OSError as e:
+                    # 已写入部分数据或属于其他错误时直接抛出
+                    if copied_total or e.errno not in _FAST_COPY_FALLBACK_ERRNOS:
+                        raise
+                if copied_total >= size:
+                    return
+                # 部分 FUSE/网络文件系统不报错而是提前返回 0，此时目标为空或不完整，同样视为不支持；
+                # 已写入部分数据时文件位置已经前移，不再尝试 sendfile，直接回退复制
+                _copy_range_unsupported.add(probe_key)
+                if copied_total:
+                    try_sendfile = False
+            if try_sendfile:
+                offset = 0
+                try:
+                    while offset < size:
+                        sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+                        if sent == 0:
+                            break
+                        offset += sent
+                except OSError as e:
+                    if offset or e.errno not in _FAST_COPY_FALLBACK_ERRNOS:
+                        raise
+                if offset >= size:
+                    return
+                # 提前返回 0（目标不完整）与不支持同样处理，回退复制
+                _sendfile_unsupported.add(probe_key)
+    # 回退复制会截断并重写目标文件（包括上面已独占创建的空文件）
+    _fallback_copy(src, dst)
 
 
 def copy_file_safely_threaded(args: tuple) -> tuple:
@@ -167,28 +410,30 @@ def copy_file_safely_threaded(args: tuple) -> tuple:
     线程安全的文件复制函数
     
     参数:
-        args: (source_path, target_path, filename, thread_id)
+        args: (source_entry, target_prefix, filename, thread_id)，source_entry 为素材图片的 os.DirEntry，
+              target_prefix 为目标目录路径加路径分隔符，filename 为已预先分配、不会冲突的目标文件名
     
     返回:
         tuple: (是否成功, 最终文件名, 错误信息, 线程ID)
     """
-    source_path, target_path, filename, thread_id = args
+    source_entry, target_prefix, filename, thread_id = args
     
     try:
-        # 生成唯一文件名
-        unique_filename = generate_unique_filename(target_path, filename)
-        
-        source_file_path = source_path / filename
-        target_file_path = target_path / unique_filename
+        target_file_path = target_prefix + filename
         
-        # 复制文件
-        shutil.copy2(source_file_path, target_file_path)
+        # 只复制文件内容（优先 reflink / 内核内复制），再用 DirEntry 缓存的 stat 回写时间戳，
+        # 省去 copy2 每个文件额外的 stat/chmod 等系统调用
+        source_stat = source_entry.stat()
+        _fast_copy(source_entry.path, target_file_path, source_stat.st_size,
+                   (source_stat.st_dev, target_prefix))
+        os.utime(target_file_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        log.debug("已复制 %s -> %s", source_entry.path, target_file_path)
         
         # 线程安全的统计更新
         with copy_lock:
             copy_stats['success'] += 1
             
-        return True, unique_filename, "", thread_id
+        return True, filename, "", thread_id
         
     except Exception as e:
         with copy_lock:
@@ -196,8 +441,21 @@ def copy_file_safely_threaded(args: tuple) -> tuple:
         return False, filename, str(e), thread_id
 
 
+def copy_batch_threaded(batch: list) -> list:
+    """
+    在同一个线程任务中依次复制一批文件
+
+    参数:
+        batch: copy_file_safely_threaded 所需参数元组的列表
+
+    返回:
+        list: 每个文件的复制结果元组，顺序与 batch 一致
+    """
+    return [copy_file_safely_threaded(task) for task in batch]
+
+
 def copy_random_images_parallel(source_folders: List[Path], target_folders: List[Path], 
-                               max_workers: int = 4) -> Tuple[bool, int, int]:
+                               max_workers: int = COPY_MAX_WORKERS) -> Tuple[bool, int, int]:
     """
     并行复制图片文件，提升处理速度
     
@@ -218,16 +476,43 @@ def copy_random_images_parallel(source_folders: List[Path], target_folders: List
     # 准备复制任务列表
     copy_tasks = []
     
-    for target_folder in target_folders:
+    if len(target_folders) == 1:
+        # 只有一个发布子目录时每个分类只需抽一张，边扫描边抽样，无需保存整个图片列表
+        # 目标路径前缀每个目录只拼接一次，之后直接与文件名做字符串拼接
+        target_prefix = f"{target_folders[0]}{os.sep}"
+        used_names = get_existing_names(target_folders[0])
         for source_folder in source_folders:
-            # 获取源文件夹中的图片文件
-            image_files = [f for f in source_folder.iterdir() 
-                         if f.is_file() and f.suffix.lower() in image_extensions]
+            selected_image = sample_one_image_in_directory(source_folder, IMAGE_EXTENSIONS)
+            if selected_image is None:
+                print(f"⚠️ 素材分类 '{source_folder.name}' 中没有图片文件，将跳过该分类")
+                continue
+            # 目标文件名加上分类名前缀，不同分类的同名图片不会互相冲突
+            target_name = generate_unique_filename(
+                used_names, f"{source_folder.name}__{selected_image.name}")
+            copy_tasks.append((selected_image, target_prefix, target_name, len(copy_tasks)))
+    else:
+        # 每个素材分类只扫描一次，所有发布子目录共用扫描结果；
+        # 每个发布子目录只列一次已有文件，文件名在提交任务前分配好，复制线程之间不会抢同一个名字
+        targets = [(f"{target_folder}{os.sep}", get_existing_names(target_folder))
+                   for target_folder in target_folders]
+        
+        # 按素材分类依次生成任务：同一分类的图片连续复制到所有发布子目录，
+        # 源目录和被选中图片的数据在系统缓存中保持"热"状态；每个发布子目录仍各自随机选图
+        choose = _rng().choice
+        for source_folder in source_folders:
+            image_files = get_image_files_in_directory(source_folder, IMAGE_EXTENSIONS)
+            if not image_files:
+                print(f"⚠️ 素材分类 '{source_folder.name}' 中没有图片文件，将跳过该分类")
+                continue
             
-            if image_files:
-                # 随机选择一张图片
-                selected_image = random.choice(image_files)
-                copy_tasks.append((source_folder, target_folder, selected_image.name, len(copy_tasks)))
+            picks = [(choose(image_files), target) for target in targets]
+            # 同一张图片被多个子目录选中时排在一起，连续读取同一文件
+            picks.sort(key=lambda pick: pick[0].name)
+            for selected_image, (target_prefix, used_names) in picks:
+                # 目标文件名加上分类名前缀
+                target_name = generate_unique_filename(
+                    used_names, f"{source_folder.name}__{selected_image.name}")
+                copy_tasks.append((selected_image, target_prefix, target_name, len(copy_tasks)))
     
     copy_stats['total'] = len(copy_tasks)
     
@@ -237,39 +522,32 @@ def copy_random_images_parallel(source_folders: List[Path], target_folders: List
     
     print(f"📋 准备复制 {len(copy_tasks)} 个文件...")
     
-    # 使用线程池并行执行
+    # 按批切分任务，每个线程任务复制一批文件，减少提交到线程池的任务数
+    batch_size = max(1, min(COPY_BATCH_SIZE, -(-len(copy_tasks) // max_workers)))
+    batches = [copy_tasks[i:i + batch_size] for i in range(0, len(copy_tasks), batch_size)]
+    
+    # 使用线程池并行执行；copy_file_safely_threaded 自行捕获异常，map 只会返回结果元组。
+    # 主线程只输出失败项和定期汇总，成功项不再逐个输出；输出先缓存，
+    # 每次汇总时连同失败项一次性写入标准输出，避免逐行写入拖慢复制
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # 提交所有任务
-        future_to_task = {executor.submit(copy_file_safely_threaded, task): task 
-                         for task in copy_tasks}
-        
-        # 处理完成的任务
         completed = 0
-        for future in as_completed(future_to_task):
+        pending_lines = []
+        results = chain.from_iterable(executor.map(copy_batch_threaded, batches))
+        for success, final_name, error, thread_id in results:
             completed += 1
-            task = future_to_task[future]
             
-            try:
-                success, final_name, error, thread_id = future.result()
-                
-                # 计算进度
+            if not success:
                 progress = (completed / len(copy_tasks)) * 100
-                
-                if success:
-                    print(f"✅ [{progress:5.1f}%] 线程{thread_id:2d}: {final_name}")
-                else:
-                    print(f"❌ [{progress:5.1f}%] 线程{thread_id:2d}: {task[2]} - {error}")
-                    
-                # 每10个任务显示一次汇总
-                if completed % 10 == 0 or completed == len(copy_tasks):
-                    with copy_lock:
-                        print(f"📊 进度汇总: {copy_stats['success']}/{copy_stats['total']} 成功, "
-                             f"{copy_stats['failed']} 失败")
-                        
-            except Exception as e:
-                print(f"❌ 任务执行异常: {e}")
+                pending_lines.append(f"❌ [{progress:5.1f}%] 任务{thread_id:2d}: {final_name} - {error}")
+            
+            # 每100个任务显示一次汇总
+            if completed % 100 == 0 or completed == len(copy_tasks):
                 with copy_lock:
-                    copy_stats['failed'] += 1
+                    pending_lines.append(f"📊 进度汇总: {copy_stats['success']}/{copy_stats['total']} 成功, "
+                                         f"{copy_stats['failed']} 失败")
+                sys.stdout.write('\n'.join(pending_lines) + '\n')
+                sys.stdout.flush()
+                pending_lines.clear()
     
     # 返回结果
     success_rate = copy_stats['success'] / copy_stats['total'] if copy_stats['total'] > 0 else 0
@@ -287,12 +565,47 @@ def main():
     """
     主函数：控制程序的执行流程。
     """
+    parser = argparse.ArgumentParser(description="将素材文件夹各分类中的随机图片复制到发布文件夹的各个子目录")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="输出每个文件的复制明细（默认只输出进度汇总和统计）")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(message)s', stream=sys.stdout)
+    
     try:
         # 记录脚本开始时间
         script_start_time = time.time()
         
+        # 检测是否为非交互模式（Web环境或管道输入）
+        is_non_interactive = hasattr(sys.stdin, 'isatty') and not sys.stdin.isatty()
+        
+        if is_non_interactive:
+            # 从标准输入读取参数（按服务器传递顺序：source_path, target_path）
+            try:
+                source_path = Path(input().strip())
+                target_path = Path(input().strip())
+                for folder_path in (source_path, target_path):
+                    if not is_existing_directory(folder_path):
+                        raise ValueError(f"路径不存在或不是目录: {folder_path}")
+            except (ValueError, EOFError) as e:
+                print(f"❌ 参数读取错误: {e}")
+                return
+        else:
+            source_path = get_valid_folder_path_from_user("请输入素材文件夹路径: ")
+            target_path = get_valid_folder_path_from_user("请输入发布文件夹路径: ")
+        
+        print(f"素材文件夹: {source_path}")
+        print(f"发布文件夹: {target_path}")
+        
+        source_folders = get_subdirectories(source_path, "素材")
+        target_folders = get_subdirectories(target_path, "发布")
+        if not source_folders or not target_folders:
+            print("⚠️ 素材文件夹或发布文件夹中没有子目录，无需复制。")
+            return
+        print(f"找到 {len(source_folders)} 个素材分类，{len(target_folders)} 个发布子目录")
+        
         # 执行图片复制任务
-        success, copied_count, attempted_count = copy_random_images_parallel()
+        success, copied_count, attempted_count = copy_random_images_parallel(source_folders, target_folders)
         
         # 输出脚本总执行时间
         script_end_time = time.time()
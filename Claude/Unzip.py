@@ -14,8 +14,8 @@
 # 工作流程 (Workflow):
 #   1. 提示用户输入包含ZIP文件的文件夹路径
 #   2. 验证用户输入的路径是否为有效文件夹
-#   3. 扫描文件夹中的所有ZIP文件
-#   4. 显示找到的ZIP文件列表供用户确认
+#   3. 扫描文件夹中的ZIP文件（在开始解压前一次性完成，解压出的ZIP文件不会被再次处理）
+#   4. 依次处理扫描时存在的ZIP文件
 #   5. 对每个ZIP文件执行解压缩操作
 #   6. 显示详细的处理进度和统计信息
 #   7. 生成最终的处理报告
@@ -53,22 +53,54 @@
 import os
 import time
 import sys
+import mmap
+import queue
+import shutil
+import struct
+import threading
 import zipfile
+import zlib
+from collections import namedtuple
+from contextlib import contextmanager
 from pathlib import Path
 
-# Python 3.7兼容的类型提示导入
-try:
-    from typing import Tuple, Optional, List
-except ImportError:
-    # 如果typing模块导入失败，定义空的类型提示
-    Tuple = tuple
-    Optional = type(None)
-    List = list
+# typing 自 Python 3.5 起即为标准库，3.7 下直接导入即可
+from typing import Tuple, Optional, Iterator
 
 
+# 解压失败记录：(文件名, 错误信息)
+FailedArchive = namedtuple('FailedArchive', 'filename error')
+
 # 支持的压缩文件扩展名
 SUPPORTED_ARCHIVE_EXTENSIONS = {'.zip'}
 
+# 供 str.endswith 使用的扩展名元组
+_ARCHIVE_SUFFIXES = tuple(SUPPORTED_ARCHIVE_EXTENSIONS)
+
+# 进度汇报线程合并输出的间隔（秒）
+PROGRESS_REPORT_INTERVAL = 0.2
+
+# 本地文件头固定部分长度及签名（ZIP 规范 4.3.7）
+_LOCAL_HEADER_SIZE = 30
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+
+# 内核态拷贝（仅 Linux 且 Python 3.8+ 提供 os.copy_file_range）
+_HAS_COPY_FILE_RANGE = hasattr(os, 'copy_file_range') and hasattr(os, 'pread')
+
+# 成员解压时每次读写的块大小（128 KB）
+EXTRACT_BUFFER_SIZE = 1 << 17
+
+# 线程本地状态：每个线程各自持有已创建目录集合
+_THREAD_STATE = threading.local()
+
+# 文件大小单位（以移位预先计算，避免每次调用重复计算）
+_KB = 1 << 10
+_MB = 1 << 20
+_GB = 1 << 30
+
+# 文件大小单位表：(单位, 对应的字节数)
+_SIZE_UNITS = (('B', 1), ('KB', _KB), ('MB', _MB), ('GB', _GB))
+
 
 def get_valid_folder_path_from_user(prompt_message: str) -> Path:
     """
@@ -113,62 +145,340 @@ def get_valid_folder_path_from_user(prompt_message: str) -> Path:
             print(f"错误：处理路径时发生异常: {e}。请重新输入。")
 
 
-def get_file_size_formatted(file_path: Path) -> str:
+def get_file_size_formatted(size_bytes: int) -> str:
     """
     获取格式化的文件大小字符串。
     
     参数:
-        file_path (Path): 文件路径。
+        size_bytes (int): 文件大小（字节），由扫描阶段一次性获取。
     
     返回:
         str: 格式化的文件大小字符串。
     """
     try:
-        size_bytes = file_path.stat().st_size
-        
-        if size_bytes < 1024:
+        # 每 10 位二进制对应一级单位，直接由位长度查表，无需逐级比较
+        unit_index = max(0, min(len(_SIZE_UNITS) - 1, (size_bytes.bit_length() - 1) // 10))
+        unit, unit_bytes = _SIZE_UNITS[unit_index]
+        if unit_bytes == 1:
             return f"{size_bytes} B"
-        elif size_bytes < 1024 * 1024:
-            return f"{size_bytes / 1024:.1f} KB"
-        elif size_bytes < 1024 * 1024 * 1024:
-            return f"{size_bytes / (1024 * 1024):.1f} MB"
-        else:
-            return f"{size_bytes / (1024 * 1024 * 1024):.1f} GB"
+        return f"{size_bytes / unit_bytes:.1f} {unit}"
     except Exception:
         return "未知大小"
 
 
-def scan_zip_files(folder_path: Path) -> list:
+def scan_zip_files(folder_path: Path) -> Iterator[Tuple[Path, int]]:
     """
-    扫描文件夹中的ZIP文件。
+    扫描文件夹中的ZIP文件（生成器）。
+    
+    解压结果写入同一文件夹，调用方需在开始解压前取完全部结果，
+    否则解压出的ZIP文件也可能被遍历到。每个目录项只 stat 一次，文件大小随路径一起产出，供显示和统计复用。
     
     参数:
         folder_path (Path): 文件夹路径。
     
-    返回:
-        list: ZIP文件路径列表。
+    产出:
+        tuple: (ZIP文件路径, 文件大小字节数)
     """
-    zip_files = []
-    
     try:
-        for file_path in folder_path.iterdir():
-            if file_path.is_file():
-                # 检查文件是否是ZIP文件（忽略大小写）
-                if file_path.suffix.lower() in SUPPORTED_ARCHIVE_EXTENSIONS:
-                    zip_files.append(file_path)
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                # 直接在文件名字符串上检查扩展名（忽略大小写），仅对命中项构造 Path
+                if not entry.name.lower().endswith(_ARCHIVE_SUFFIXES):
+                    continue
+                if not entry.is_file():
+                    continue
+                try:
+                    size_bytes = entry.stat().st_size
+                except OSError:
+                    size_bytes = 0
+                yield Path(entry.path), size_bytes
     except Exception as e:
         print(f"扫描文件夹时发生错误: {e}")
+
+
+class _MappedZipSource:
+    """
+    为 mmap 对象补齐 zipfile 需要的文件接口。
+    
+    mmap 本身没有 seekable()，越界 seek 时抛出 ValueError 而不是 OSError，
+    zipfile 依赖后者来识别损坏的压缩包，因此在这里做一次转换。
+    """
+    
+    def __init__(self, zip_map: mmap.mmap, file_descriptor: int):
+        self._map = zip_map
+        self._fd = file_descriptor
+    
+    def fileno(self) -> int:
+        return self._fd
     
-    return zip_files
+    def read(self, size: int = -1) -> bytes:
+        return self._map.read(size)
+    
+    def seek(self, offset: int, whence: int = 0) -> int:
+        try:
+            self._map.seek(offset, whence)
+        except ValueError as e:
+            raise OSError(str(e))
+        return self._map.tell()
+    
+    def tell(self) -> int:
+        return self._map.tell()
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def crc32(self, offset: int, size: int) -> int:
+        """直接在映射的内存上计算一段数据的 CRC-32，不复制数据。"""
+        with memoryview(self._map) as view:
+            return zlib.crc32(view[offset:offset + size])
 
 
-def extract_zip_file(zip_path: Path, extract_to: Path) -> Tuple[bool, Optional[str], int]:
+@contextmanager
+def open_zip_mapped(zip_path: Path):
+    """
+    以内存映射方式打开ZIP文件。
+    
+    zipfile 解析中央目录时会发起大量小块 read()；映射后由内核按需
+    调入 EOCD/中央目录所在的页，省去缓冲文件对象的多次拷贝，
+    对包含成千上万个条目的压缩包尤其明显。
+    
+    参数:
+        zip_path (Path): ZIP文件路径。
+    
+    产出:
+        zipfile.ZipFile: 基于内存映射的ZIP文件对象。
+    """
+    with open(zip_path, 'rb') as zip_fh:
+        try:
+            zip_map = mmap.mmap(zip_fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射，按损坏的ZIP文件处理
+            raise zipfile.BadZipFile(f"'{zip_path.name}' 是空文件")
+        try:
+            with zipfile.ZipFile(_MappedZipSource(zip_map, zip_fh.fileno()), 'r') as zip_ref:
+                yield zip_ref
+        finally:
+            # 解压结束后释放映射
+            zip_map.close()
+
+
+def resolve_member_target(info: zipfile.ZipInfo, extract_to: Path) -> str:
+    """
+    计算ZIP成员的解压目标路径，规则与 ZipFile.extract 保持一致。
+    
+    去除盘符、空路径段、"." 与 ".."，防止成员写到解压目录之外。
+    
+    参数:
+        info (zipfile.ZipInfo): ZIP成员信息。
+        extract_to (Path): 解压目标文件夹路径。
+    
+    返回:
+        str: 成员的目标文件路径。
+    """
+    arcname = info.filename.replace('/', os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    invalid_path_parts = ('', os.path.curdir, os.path.pardir)
+    arcname = os.path.sep.join(x for x in arcname.split(os.path.sep)
+                               if x not in invalid_path_parts)
+    if os.path.sep == '\\':
+        # Windows 下替换非法字符，与 ZipFile.extract 行为一致
+        arcname = zipfile.ZipFile._sanitize_windows_name(arcname, os.path.sep)
+    return os.path.normpath(os.path.join(str(extract_to), arcname))
+
+
+def ensure_directory(dir_path: str) -> None:
+    """
+    确保目录存在，已创建过的目录记录在线程本地集合中，不再重复检查。
+    
+    同一压缩包内大量成员共享父目录，缓存后稳定状态下几乎没有目录相关的系统调用。
+    
+    参数:
+        dir_path (str): 目录路径。
+    """
+    if not dir_path:
+        return
+    created_dirs = getattr(_THREAD_STATE, 'created_dirs', None)
+    if created_dirs is None:
+        created_dirs = set()
+        _THREAD_STATE.created_dirs = created_dirs
+    if dir_path in created_dirs:
+        return
+    os.makedirs(dir_path, exist_ok=True)
+    created_dirs.add(dir_path)
+
+
+def extract_stored_member(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo, extract_to: Path) -> bool:
+    """
+    使用 os.copy_file_range 在内核中直接拷贝未压缩（ZIP_STORED）的成员。
+    
+    存储方式的成员无需解压，数据在压缩包中连续存放，跳过 Python 的
+    read/write 循环即可做到零用户态拷贝。拷贝前先像 ZipFile.extract 一样校验 CRC-32
+    （在内存映射上直接计算）。不满足条件、校验不通过或拷贝未完成时返回 False，
+    由调用方回退到 extract_member_buffered（损坏的成员由其抛出 BadZipFile）。
+    
+    参数:
+        zip_ref (zipfile.ZipFile): 已打开的ZIP文件对象。
+        info (zipfile.ZipInfo): ZIP成员信息。
+        extract_to (Path): 解压目标文件夹路径。
+    
+    返回:
+        bool: 是否已通过快速路径完成解压。
+    """
+    if (not _HAS_COPY_FILE_RANGE
+            or info.compress_type != zipfile.ZIP_STORED
+            or info.flag_bits & 0x1  # 加密成员需要解密
+            or info.is_dir()):
+        return False
+    
+    src_fd = zip_ref.fp.fileno()
+    
+    # 读取本地文件头，计算数据区起始偏移
+    header = os.pread(src_fd, _LOCAL_HEADER_SIZE, info.header_offset)
+    if len(header) != _LOCAL_HEADER_SIZE or header[:4] != _LOCAL_HEADER_SIGNATURE:
+        return False
+    name_length, extra_length = struct.unpack('<HH', header[26:30])
+    data_offset = info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length
+    
+    if _member_crc32(zip_ref, data_offset, info.file_size) != info.CRC:
+        return False
+    
+    target_path = resolve_member_target(info, extract_to)
+    ensure_directory(os.path.dirname(target_path))
+    
+    out_fd = os.open(target_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        remaining = info.file_size
+        while remaining > 0:
+            copied = os.copy_file_range(src_fd, out_fd, remaining, offset_src=data_offset)
+            if copied == 0:
+                # 部分 FUSE/网络文件系统会提前返回 0 而不是报错，回退到普通解压（会重写目标文件）
+                return False
+            data_offset += copied
+            remaining -= copied
+    except OSError:
+        # 文件系统不支持（如旧内核跨设备拷贝），回退到普通解压
+        return False
+    finally:
+        os.close(out_fd)
+    
+    return True
+
+
+def _member_crc32(zip_ref: zipfile.ZipFile, offset: int, size: int) -> int:
+    """
+    计算压缩包中一段数据的 CRC-32：内存映射打开时直接在映射上计算，否则按块 pread。
+    """
+    source = zip_ref.fp
+    if isinstance(source, _MappedZipSource):
+        return source.crc32(offset, size)
+    src_fd = source.fileno()
+    crc = 0
+    end = offset + size
+    while offset < end:
+        chunk = os.pread(src_fd, min(EXTRACT_BUFFER_SIZE, end - offset), offset)
+        if not chunk:
+            break
+        crc = zlib.crc32(chunk, crc)
+        offset += len(chunk)
+    return crc
+
+
+def extract_member_buffered(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo, extract_to: Path) -> str:
+    """
+    以 EXTRACT_BUFFER_SIZE 大小的块解压单个ZIP成员。
+    
+    ZipExtFile 没有原生的 readinto（BufferedIOBase.readinto 会先 read 再复制一次），
+    因此用 copyfileobj 按块直接写出 read 返回的字节。
+    
+    参数:
+        zip_ref (zipfile.ZipFile): 已打开的ZIP文件对象。
+        info (zipfile.ZipInfo): ZIP成员信息。
+        extract_to (Path): 解压目标文件夹路径。
+    
+    返回:
+        str: 成员的目标路径。
+    """
+    target_path = resolve_member_target(info, extract_to)
+    
+    if info.is_dir():
+        ensure_directory(target_path)
+        return target_path
+    
+    ensure_directory(os.path.dirname(target_path))
+    
+    with zip_ref.open(info) as source, open(target_path, 'wb') as target:
+        shutil.copyfileobj(source, target, EXTRACT_BUFFER_SIZE)
+    return target_path
+
+
+class ProgressReporter:
+    """
+    进度汇报器：由单独的汇报线程统一写标准输出。
+    
+    解压流程只把 (压缩包名, 已完成数, 总数) 事件放入队列，不直接写输出；
+    汇报线程每隔 PROGRESS_REPORT_INTERVAL 秒取出全部事件，同一压缩包
+    只保留最新进度，合并成一次 write 输出。多个解压线程并发时输出不会
+    交错，热路径上也没有输出锁竞争。
+    """
+    
+    def __init__(self, interval: float = PROGRESS_REPORT_INTERVAL):
+        self._events = queue.Queue()
+        self._interval = interval
+        self._stop_event = threading.Event()
+        # 取出事件与写输出在同一把锁内完成，保证汇报线程与 flush 调用方
+        # 不会一方已取走事件、另一方先输出更早的状态
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="progress-reporter", daemon=True)
+        self._thread.start()
+    
+    def report(self, archive_name: str, done: int, total: int) -> None:
+        """记录一条进度事件（不阻塞、不写输出）。"""
+        self._events.put((archive_name, done, total))
+    
+    def flush(self) -> None:
+        """立即输出所有尚未输出的进度，用于在打印其它信息前保持输出顺序。"""
+        with self._write_lock:
+            latest = {}
+            while True:
+                try:
+                    archive_name, done, total = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                latest[archive_name] = (done, total)
+            if not latest:
+                return
+            # 多个压缩包并发解压时，每行注明所属压缩包
+            lines = [
+                f"  [{archive_name}] 解压进度: {done}/{total} ({(done / total) * 100:.1f}%)"
+                for archive_name, (done, total) in latest.items()
+            ]
+            sys.stdout.write('\n'.join(lines) + '\n')
+            sys.stdout.flush()
+    
+    def close(self) -> None:
+        """停止汇报线程并输出剩余进度。"""
+        self._stop_event.set()
+        self._thread.join()
+        self.flush()
+    
+    def _run(self) -> None:
+        # flush 在 _write_lock 内完成取出与输出
+        while not self._stop_event.wait(self._interval):
+            self.flush()
+
+
+def extract_zip_file(zip_path: Path, extract_to: Path, size_bytes: int,
+                     progress_reporter: ProgressReporter) -> Tuple[bool, Optional[str], int]:
     """
     解压单个ZIP文件。
     
     参数:
         zip_path (Path): ZIP文件路径。
         extract_to (Path): 解压目标文件夹路径。
+        size_bytes (int): 扫描阶段得到的文件大小（字节）。
+        progress_reporter (ProgressReporter): 进度汇报器。
     
     返回:
         tuple: (是否成功, 错误信息, 解压的文件数量)
@@ -189,15 +499,15 @@ def extract_zip_file(zip_path: Path, extract_to: Path) -> Tuple[bool, Optional[s
             return False, error_msg, 0
 
         # 获取文件大小信息
-        file_size = get_file_size_formatted(zip_path)
+        file_size = get_file_size_formatted(size_bytes)
         print(f"文件大小: {file_size}")
         
         print("正在检查ZIP文件完整性...")
         
-        # 打开并验证ZIP文件
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        # 打开并验证ZIP文件（内存映射方式）
+        with open_zip_mapped(zip_path) as zip_ref:
             # 获取ZIP文件内的文件列表
-            file_list = zip_ref.namelist()
+            file_list = zip_ref.infolist()
             file_count = len(file_list)
             
             print(f"ZIP文件包含 {file_count} 个项目")
@@ -218,18 +528,24 @@ def extract_zip_file(zip_path: Path, extract_to: Path) -> Tuple[bool, Optional[s
             
             # 解压所有文件
             extracted_count = 0
-            for i, member in enumerate(file_list, 1):
+            # 每完成约1%或最后一个文件时上报进度，由汇报线程合并输出
+            progress_step = max(1, file_count // 100)
+            for i, info in enumerate(file_list, 1):
                 try:
-                    # 显示进度（每处理10个文件或最后一个文件时显示）
-                    if i % 10 == 0 or i == file_count:
-                        print(f"  解压进度: {i}/{file_count} ({(i/file_count)*100:.1f}%)")
+                    if i % progress_step == 0 or i == file_count:
+                        progress_reporter.report(zip_path.name, i, file_count)
                     
-                    zip_ref.extract(member, extract_to)
+                    # 未压缩成员优先走内核拷贝，其余成员使用标准解压
+                    if not extract_stored_member(zip_ref, info, extract_to):
+                        extract_member_buffered(zip_ref, info, extract_to)
                     extracted_count += 1
                     
                 except Exception as extract_e:
-                    print(f"  警告：解压文件 '{member}' 时发生错误: {extract_e}")
+                    progress_reporter.flush()
+                    print(f"  警告：解压文件 '{info.filename}' 时发生错误: {extract_e}")
             
+            # 先输出剩余进度，保证结果信息出现在进度之后
+            progress_reporter.flush()
             print(f"✅ 成功解压 {extracted_count}/{file_count} 个文件到 '{extract_to}'")
             print(f"===== 文件处理完毕: {zip_path.name} =====")
             
@@ -300,27 +616,13 @@ def process_zip_files_batch() -> Tuple[bool, int, int, int]:
         print(f"- 解压目标: 同一文件夹内")
         print(f"- 原文件处理: 保留原ZIP文件")
         
-        # 2. 扫描ZIP文件
+        # 2. 扫描ZIP文件：解压前取得完整列表，只处理此时已存在的压缩包
         print("\n步骤 2: 扫描ZIP文件")
-        zip_files = scan_zip_files(folder_path)
-        
-        if not zip_files:
-            print(f"⚠️ 警告：在文件夹 '{folder_path}' 中没有找到任何ZIP文件")
-            print(f"支持的格式: {', '.join(sorted(SUPPORTED_ARCHIVE_EXTENSIONS))}")
-            return False, 0, 0, 0
-        
-        print(f"找到 {len(zip_files)} 个ZIP文件:")
-        total_size = 0
-        for i, zip_path in enumerate(zip_files, 1):
-            file_size = get_file_size_formatted(zip_path)
-            print(f"  {i}. {zip_path.name} ({file_size})")
-            try:
-                total_size += zip_path.stat().st_size
-            except Exception:
-                pass
+        zip_entries = list(scan_zip_files(folder_path))
+        print(f"找到 {len(zip_entries)} 个ZIP文件")
         
         # 3. 自动开始处理（Web环境下不需要用户确认）
-        print(f"\n步骤 3: 开始批量解压 {len(zip_files)} 个ZIP文件")
+        print("\n步骤 3: 开始批量解压ZIP文件")
         print("ℹ️ 注意：原ZIP文件将保留，解压内容将放置在同一文件夹内。")
         
         # 4. 开始批量处理
@@ -330,12 +632,19 @@ def process_zip_files_batch() -> Tuple[bool, int, int, int]:
         error_files_count = 0
         total_extracted_files = 0
         failed_files = []
+        zip_files_count = 0
+        total_size = 0
+        # 进度统一交给汇报线程输出
+        progress_reporter = ProgressReporter()
         
-        for i, zip_path in enumerate(zip_files, 1):
-            print(f"\n[{i}/{len(zip_files)}] 处理文件: {zip_path.name}")
+        for zip_path, size_bytes in zip_entries:
+            zip_files_count += 1
+            total_size += size_bytes
+            file_size = get_file_size_formatted(size_bytes)
+            print(f"\n[{zip_files_count}/{len(zip_entries)}] 处理文件: {zip_path.name} ({file_size})")
             
             try:
-                success, error_msg, extracted_count = extract_zip_file(zip_path, folder_path)
+                success, error_msg, extracted_count = extract_zip_file(zip_path, folder_path, size_bytes, progress_reporter)
                 
                 if success:
                     processed_files_count += 1
@@ -343,10 +652,7 @@ def process_zip_files_batch() -> Tuple[bool, int, int, int]:
                     print(f"✅ 成功解压 - 提取了 {extracted_count} 个文件")
                 else:
                     error_files_count += 1
-                    failed_files.append({
-                        'filename': zip_path.name,
-                        'error': error_msg or '未知错误'
-                    })
+                    failed_files.append(FailedArchive(zip_path.name, error_msg or '未知错误'))
                     print(f"❌ 解压失败 - {error_msg or '未知错误'}")
                     
             except KeyboardInterrupt:
@@ -354,12 +660,16 @@ def process_zip_files_batch() -> Tuple[bool, int, int, int]:
                 break
             except Exception as e:
                 error_files_count += 1
-                failed_files.append({
-                    'filename': zip_path.name,
-                    'error': f'未预期的错误: {e}'
-                })
+                failed_files.append(FailedArchive(zip_path.name, f'未预期的错误: {e}'))
                 print(f"❌ 处理文件时发生未预期的错误: {e}")
         
+        progress_reporter.close()
+        
+        if zip_files_count == 0:
+            print(f"⚠️ 警告：在文件夹 '{folder_path}' 中没有找到任何ZIP文件")
+            print(f"支持的格式: {', '.join(sorted(SUPPORTED_ARCHIVE_EXTENSIONS))}")
+            return False, 0, 0, 0
+        
         # 5. 生成处理报告
         execution_time = time.time() - start_time
         
@@ -367,7 +677,7 @@ def process_zip_files_batch() -> Tuple[bool, int, int, int]:
         print("📊 处理完成 - 统计报告")
         print("=" * 60)
         print(f"📁 处理文件夹: {folder_path}")
-        print(f"📦 扫描到的ZIP文件: {len(zip_files)} 个")
+        print(f"📦 扫描到的ZIP文件: {zip_files_count} 个")
         print(f"✅ 成功解压: {processed_files_count} 个ZIP文件")
         print(f"❌ 解压失败: {error_files_count} 个ZIP文件")
         print(f"📄 总计提取文件: {total_extracted_files} 个")
@@ -381,7 +691,7 @@ def process_zip_files_batch() -> Tuple[bool, int, int, int]:
         if failed_files:
             print(f"\n⚠️  处理失败的文件:")
             for failed_file in failed_files:
-                print(f"   - {failed_file['filename']}: {failed_file['error']}")
+                print(f"   - {failed_file.filename}: {failed_file.error}")
         
         print("=" * 60)
         
@@ -1,10 +1,16 @@
 import os
+import sys
+import queue
+import argparse
 import subprocess
 import pathlib
 import time
 import signal
+import itertools
 import threading
-from typing import Union, Tuple, List, Optional, Dict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Union, Tuple, List, Optional, Dict, Iterator
 
 # ==============================================================================
 # WebP 文件批量重新生成脚本 (从原始视频)
@@ -21,11 +27,10 @@ from typing import Union, Tuple, List, Optional, Dict
 #   2. 提示用户输入 WebP 文件的大小阈值 (MB) 和重新生成时使用的新目标帧率 (fps)
 #   3. 验证用户输入的路径是否为有效文件夹
 #   4. 检查 FFmpeg 是否已安装并配置
-#   5. 预扫描并显示符合条件的 WebP 文件列表
-#   6. 用户确认后开始批量处理
-#   7. 递归遍历指定根目录及其所有子目录
-#   8. 查找所有超过阈值的 WebP 文件并尝试重新生成
-#   9. 实时显示处理进度和统计信息
+#   5. 后台线程递归遍历指定根目录及其所有子目录，查找超过阈值的 WebP 文件
+#   6. 扫描结果通过有界队列边扫描边交给处理流程，无需等待扫描结束
+#   7. 多个 FFmpeg 任务并发执行，实时显示处理进度
+#   8. 处理结束后显示扫描汇总和最终统计信息
 #
 # 注意事项 (Important Notes):
 #   - 依赖 FFmpeg：确保 FFmpeg 已正确安装
@@ -37,11 +42,42 @@ from typing import Union, Tuple, List, Optional, Dict
 
 # --- 配置参数 ---
 FFMPEG_PATH = "ffmpeg"
-ORIGINAL_VIDEO_EXTENSIONS = ['.mp4', '.mov', '.mkv', '.avi', '.wmv', '.flv', '.webm', '.mpeg', '.mpg']
+# 文件大小显示单位
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+# 按优先级排列，均为小写（查找时不区分大小写）
+ORIGINAL_VIDEO_EXTENSIONS = ('.mp4', '.mov', '.mkv', '.avi', '.wmv', '.flv', '.webm', '.mpeg', '.mpg')
+
+# --- 并发参数 ---
+# 并发任务数与每个 FFmpeg 任务的线程数，两者乘积约等于 CPU 核心数
+DEFAULT_THREADS_PER_JOB = 2
+MIN_PARALLELISM = 1
+MAX_PARALLELISM = 64
+# 通过环境变量设置每个 FFmpeg 任务的默认线程数（命令行参数优先）
+FFMPEG_THREADS_ENV_VAR = "WEBP_REGEN_FFMPEG_THREADS"
+# 主线程等待任务完成的轮询间隔（秒）：保持对 Ctrl+C 的响应
+RESULT_POLL_INTERVAL = 0.5
+# 长时间没有任务完成时输出心跳信息的间隔（秒）
+HEARTBEAT_INTERVAL = 10.0
+# 目录扫描线程数：目录读取以系统调用等待为主，线程数可以远大于核心数
+SCAN_MAX_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+# 每个 FFmpeg 进程一次处理的文件数；大于 1 时多个文件共用一次进程启动和编码器初始化
+DEFAULT_BATCH_SIZE = 1
+MAX_BATCH_SIZE = 32
+
+# 扫描结束标记：扫描线程放入队列，通知处理流程没有更多文件
+_SCAN_DONE = object()
 
 # --- 全局变量用于进程管理 ---
-current_ffmpeg_process = None
+# 每个 FFmpeg 在独立的进程组中启动，终止时可以连同其子进程一起结束
+if os.name == 'nt':
+    _NEW_PROCESS_GROUP_KWARGS = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    _NEW_PROCESS_GROUP_KWARGS = {'start_new_session': True}
+# 正在运行的 FFmpeg 进程（并发执行时可能有多个）
+active_ffmpeg_processes = set()
 process_lock = threading.Lock()
+# 收到终止信号后置位，尚未开始的任务直接跳过
+stop_event = threading.Event()
 # 保持原有的转码和压缩参数不变
 BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO = [
     "-c:v", "libwebp",
@@ -50,58 +86,122 @@ BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO = [
     "-loop", "0",
     "-an",
 ]
+# 扩展名集合（小写、不含点），扫描时对文件名做一次 rpartition 后直接查表
+_WEBP_EXTENSION = "webp"
+_VIDEO_EXTENSION_SET = frozenset(ext[1:] for ext in ORIGINAL_VIDEO_EXTENSIONS)
+# 基础参数中是否已有 -vf 滤镜（决定构建命令时是否需要合并滤镜）
+_BASE_OPTIONS_HAVE_VF = "-vf" in BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO
+# 只在出错时输出日志，不打印版本横幅和编码进度，减少需要读取和解码的输出
+FFMPEG_QUIET_OPTIONS = ("-hide_banner", "-loglevel", "error", "-nostats")
 VIDEO_DURATION_FOR_WEBP = "3"  # 秒
+# 以 key=value 形式向标准输出报告进度，最后一组中的 total_size 即输出文件字节数
+FFMPEG_PROGRESS_OPTIONS = ("-progress", "pipe:1")
+_TOTAL_SIZE_KEY = b"total_size="
+# 输入级截取参数（放在 -i 之前）
+_INPUT_TRIM_OPTIONS = ("-ss", "0", "-t", VIDEO_DURATION_FOR_WEBP)
+# 命令中不随文件变化的部分，导入时构建一次
+_FFMPEG_PREFIX = (*FFMPEG_QUIET_OPTIONS, "-y")
+_FFMPEG_ENCODE_OPTS = tuple(BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO)
+# fps 滤镜字符串缓存 {帧率: "fps=帧率"}
+_fps_filter_cache = {}
 FFMPEG_TIMEOUT_SECONDS = 180
 
 
-def signal_handler(signum, frame):
-    """信号处理函数，用于处理中断信号"""
-    global current_ffmpeg_process
-    print("\n\n⚠️  接收到终止信号，正在停止当前操作...")
+def _signal_process_group(process: subprocess.Popen, force: bool) -> None:
+    """
+    向 FFmpeg 所在的进程组发送终止信号
+    POSIX 下对整个会话进程组 killpg；Windows 下先发送 CTRL_BREAK_EVENT，强制时直接结束进程
+    """
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == 'nt':
+            if force:
+                process.kill()
+            else:
+                process.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except (ProcessLookupError, PermissionError, OSError):
+        # 进程已退出或进程组已不存在
+        pass
+
+
+def _terminate_processes(processes: List[subprocess.Popen], grace_seconds: float = 5) -> None:
+    """先向所有进程组发送终止信号，共享一个等待期限，到期仍未退出的再强制结束"""
+    for process in processes:
+        _signal_process_group(process, force=False)
     
+    deadline = time.time() + grace_seconds
+    for process in processes:
+        try:
+            process.wait(timeout=max(0, deadline - time.time()))
+        except subprocess.TimeoutExpired:
+            _signal_process_group(process, force=True)
+            process.wait()
+
+
+def terminate_ffmpeg_process(process: subprocess.Popen) -> None:
+    """终止单个 FFmpeg 进程组，5 秒内未退出则强制结束"""
+    _terminate_processes([process])
+
+
+def terminate_active_ffmpeg_processes(verbose: bool = False) -> None:
+    """终止所有正在运行的 FFmpeg 进程组，并阻止尚未开始的任务启动"""
+    stop_event.set()
     with process_lock:
-        if current_ffmpeg_process and current_ffmpeg_process.poll() is None:
-            print("🔄 正在终止 FFmpeg 进程...")
-            try:
-                current_ffmpeg_process.terminate()
-                # 等待进程终止，最多等待5秒
-                try:
-                    current_ffmpeg_process.wait(timeout=5)
-                    print("✅ FFmpeg 进程已正常终止")
-                except subprocess.TimeoutExpired:
-                    print("⚠️  FFmpeg 进程未响应，强制终止...")
-                    current_ffmpeg_process.kill()
-                    current_ffmpeg_process.wait()
-                    print("✅ FFmpeg 进程已强制终止")
-            except Exception as e:
-                print(f"❌ 终止 FFmpeg 进程时出错: {e}")
-            finally:
-                current_ffmpeg_process = None
+        processes = list(active_ffmpeg_processes)
     
+    if verbose and processes:
+        print(f"🔄 正在终止 {len(processes)} 个 FFmpeg 进程...")
+    try:
+        _terminate_processes(processes)
+    except Exception as e:
+        if verbose:
+            print(f"❌ 终止 FFmpeg 进程时出错: {e}")
+    if verbose and processes:
+        print("✅ FFmpeg 进程已终止")
+
+
+def signal_handler(signum, frame):
+    """信号处理函数，用于处理中断信号"""
+    print("\n\n⚠️  接收到终止信号，正在停止当前操作...")
+    terminate_active_ffmpeg_processes(verbose=True)
     print("🛑 操作已终止")
     exit(0)
 
 
+@lru_cache(maxsize=8192)
 def get_human_readable_size(size_bytes: Optional[int]) -> str:
-    """将字节大小转换为人类可读的格式 (B, KB, MB, GB)"""
+    """将字节大小转换为人类可读的格式 (B, KB, MB, GB, TB)，结果按大小缓存"""
     if size_bytes is None:
         return "N/A"
     if size_bytes == 0:
         return "0 B"
-    size_name = ("B", "KB", "MB", "GB", "TB")
-    i = 0
-    size_bytes_float = float(size_bytes)
-    while size_bytes_float >= 1024 and i < len(size_name) - 1:
-        size_bytes_float /= 1024.0
-        i += 1
-    return f"{size_bytes_float:.2f} {size_name[i]}"
+    # 每 10 位二进制对应一级单位，由位长度直接算出单位下标
+    unit_index = min((size_bytes.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (unit_index * 10)):.2f} {SIZE_UNITS[unit_index]}"
+
+
+def prompt_user(prompt_message: str) -> str:
+    """
+    交互式读取一行输入
+    标准输入不是终端（管道、Web 环境、CI）时不提示，避免交互循环在无人应答时挂起；
+    标准输入已关闭时同样立即报错
+    """
+    if not sys.stdin or not sys.stdin.isatty():
+        raise RuntimeError("标准输入不是交互式终端，请通过标准输入按顺序传递参数（非交互模式）")
+    try:
+        return input(prompt_message)
+    except EOFError:
+        raise RuntimeError("标准输入已关闭，请使用非交互模式传递参数")
 
 
 def get_valid_folder_path_from_user(prompt_message: str) -> pathlib.Path:
     """提示用户输入一个文件夹路径，并验证其有效性"""
     while True:
         print(f"\n{prompt_message}")
-        folder_path_str = input(">> ").strip()
+        folder_path_str = prompt_user(">> ").strip()
         
         # 移除引号
         if folder_path_str.startswith('"') and folder_path_str.endswith('"'):
@@ -154,7 +254,7 @@ def get_regeneration_parameters() -> Tuple[float, int]:
     while True:
         try:
             print("\n📏 文件大小阈值设置:")
-            size_threshold_mb_str = input("请输入大小阈值 (MB)，超过此大小的 WebP 文件将被重新生成\n>> ").strip()
+            size_threshold_mb_str = prompt_user("请输入大小阈值 (MB)，超过此大小的 WebP 文件将被重新生成\n>> ").strip()
             size_threshold_mb = float(size_threshold_mb_str)
             if size_threshold_mb <= 0:
                 print("❌ 错误：大小阈值必须为正数。")
@@ -169,7 +269,7 @@ def get_regeneration_parameters() -> Tuple[float, int]:
     while True:
         try:
             print("\n🎬 帧率设置:")
-            new_fps_str = input("请输入重新生成 WebP 时使用的目标帧率 (fps)\n>> ").strip()
+            new_fps_str = prompt_user("请输入重新生成 WebP 时使用的目标帧率 (fps)\n>> ").strip()
             new_fps_val = int(new_fps_str)
             if new_fps_val <= 0:
                 print("❌ 错误：帧率必须为正整数。")
@@ -182,128 +282,298 @@ def get_regeneration_parameters() -> Tuple[float, int]:
     return size_threshold_bytes, new_fps_val
 
 
-def find_original_video_file(webp_dir_path: pathlib.Path, base_name_for_lookup: str) -> Optional[pathlib.Path]:
+def find_original_video_file(files_in_dir: Dict[str, str], base_name_for_lookup: str) -> Optional[pathlib.Path]:
     """
-    根据 WebP 文件的基本名称和目录，查找可能的原始视频文件
+    根据 WebP 文件的基本名称，在所在目录的文件清单中查找可能的原始视频文件
+    files_in_dir 为扫描时记录的 {小写视频文件名: 文件路径}，查找只做内存比对，不再逐个 stat
     返回找到的原始视频文件的 Path 对象，如果找不到则返回 None
     """
+    base_name_lower = base_name_for_lookup.lower()
     for video_ext in ORIGINAL_VIDEO_EXTENSIONS:
-        potential_video_path = webp_dir_path / (base_name_for_lookup + video_ext)
-        if potential_video_path.is_file():
-            return potential_video_path
+        video_path = files_in_dir.get(base_name_lower + video_ext)
+        if video_path is not None:
+            return pathlib.Path(video_path)
     return None
 
 
-def build_ffmpeg_command_for_regeneration(ffmpeg_exe_path: str,
-                                          source_video_path: pathlib.Path,
-                                          output_webp_path: pathlib.Path,
-                                          target_fps: int) -> List[str]:
-    """构建用于从视频重新生成WebP的FFmpeg命令列表"""
-    command = [
-        ffmpeg_exe_path,
-        "-y",
-        "-i", str(source_video_path),
-        "-t", VIDEO_DURATION_FOR_WEBP,
-    ]
+def _ffmpeg_threads_per_invocation(n_workers: int) -> int:
+    """根据并发任务数计算每个 FFmpeg 任务可用的线程数"""
+    return max(1, (os.cpu_count() or n_workers) // n_workers)
+
+
+def resolve_parallelism(workers: Optional[int], threads_per_job: Optional[int]) -> Tuple[int, int]:
+    """
+    确定并发任务数和每个任务的 FFmpeg 线程数
+    未指定的一项由另一项和 CPU 核心数推算，使两者乘积约等于核心数
+    """
+    cpu_count = os.cpu_count() or 4
+    if workers is None and threads_per_job is None:
+        threads_per_job = min(DEFAULT_THREADS_PER_JOB, cpu_count)
+    if workers is None:
+        workers = max(1, cpu_count // threads_per_job)
+    if threads_per_job is None:
+        threads_per_job = _ffmpeg_threads_per_invocation(workers)
+    return workers, threads_per_job
 
-    command.extend(BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO)
 
-    # 处理视频滤镜参数
+def _merge_fps_into_filters(options: List[str], target_fps: int) -> List[str]:
+    """
+    从编码参数中取出已有的 -vf 滤镜，去掉旧的 fps 设置后追加新的 fps，
+    合并为一个 -vf 参数（仅当基础参数本身包含 -vf 时才需要）
+    """
     existing_vf_filters = []
-    temp_command = []
+    merged_options = []
     vf_value_next = False
 
-    # 提取现有的-vf（如果有）并移除它，以便我们可以重新构建它
-    for i, opt in enumerate(command):
+    for i, opt in enumerate(options):
         if opt == "-vf":
-            if i + 1 < len(command):
-                existing_vf_filters.extend(f.strip() for f in command[i + 1].split(',') if f.strip())
+            if i + 1 < len(options):
+                existing_vf_filters.extend(f.strip() for f in options[i + 1].split(',') if f.strip())
             vf_value_next = True
             continue
         if vf_value_next:
             vf_value_next = False
             continue
-        temp_command.append(opt)
-
-    command = temp_command
+        merged_options.append(opt)
 
-    # 从现有滤镜中移除任何旧的fps设置（如果存在）
     final_filters = [f for f in existing_vf_filters if not f.startswith("fps=")]
-
-    # 添加新的fps设置
     final_filters.append(f"fps={target_fps}")
+    merged_options.extend(["-vf", ",".join(final_filters)])
+    return merged_options
+
 
-    if final_filters:
-        command.extend(["-vf", ",".join(final_filters)])
+def _thread_options(threads_per_job: int) -> Tuple[str, ...]:
+    """threads_per_job 大于 0 时返回 -threads 参数，否则交给 FFmpeg 自行决定"""
+    return ("-threads", str(threads_per_job)) if threads_per_job > 0 else ()
 
-    command.append(str(output_webp_path))
+
+def _fps_filter(target_fps: int) -> str:
+    """返回 fps 滤镜字符串，同一帧率只格式化一次"""
+    fps_filter = _fps_filter_cache.get(target_fps)
+    if fps_filter is None:
+        fps_filter = _fps_filter_cache[target_fps] = f"fps={target_fps}"
+    return fps_filter
+
+
+def make_worker_affinity_initializer(threads_per_job: int):
+    """
+    返回线程池的 initializer：把每个工作线程绑定到一段互不重叠的 CPU 上
+    （仅 Linux 提供 os.sched_setaffinity），之后由该线程启动的 FFmpeg 继承这组 CPU，
+    多个并发任务不会在同一批核心上争抢缓存；其它平台返回 None
+    """
+    if not hasattr(os, "sched_getaffinity") or threads_per_job <= 0:
+        return None
+    try:
+        available_cpus = sorted(os.sched_getaffinity(0))
+    except OSError:
+        return None
+    slot_count = len(available_cpus) // threads_per_job
+    if slot_count < 2:
+        # 核心不够划分多个互不重叠的分组时不做绑定
+        return None
+    worker_slots = itertools.count()
+    
+    def _pin_worker_thread():
+        slot = next(worker_slots) % slot_count
+        cpu_set = available_cpus[slot * threads_per_job:(slot + 1) * threads_per_job]
+        try:
+            # pid 0 表示当前线程
+            os.sched_setaffinity(0, cpu_set)
+        except OSError:
+            pass
+    
+    return _pin_worker_thread
+
+
+def build_ffmpeg_command_for_regeneration(ffmpeg_exe_path: str,
+                                          source_video_path: pathlib.Path,
+                                          output_webp_path: pathlib.Path,
+                                          target_fps: int,
+                                          threads_per_job: int = 0) -> List[str]:
+    """
+    构建用于从视频重新生成WebP的FFmpeg命令列表
+    threads_per_job 大于 0 时同时限制解码和编码线程数，避免多个并发任务争抢 CPU
+    截取参数 -ss/-t 作为输入选项放在 -i 之前：FFmpeg 直接按关键帧定位并只读取
+    所需时长，不再解码源视频其余部分（起点为 0，对正常文件即第一个关键帧）
+    """
+    thread_options = _thread_options(threads_per_job)
+    if _BASE_OPTIONS_HAVE_VF:
+        # 基础参数自带滤镜时，需要与 fps 合并为同一个 -vf
+        encode_options = _merge_fps_into_filters(BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO, target_fps)
+    else:
+        encode_options = (*_FFMPEG_ENCODE_OPTS, "-vf", _fps_filter(target_fps))
+
+    return [
+        ffmpeg_exe_path,
+        *_FFMPEG_PREFIX,
+        # 放在 -i 之前限制解码线程，放在输出之前限制编码线程
+        *thread_options,
+        *_INPUT_TRIM_OPTIONS,
+        "-i", str(source_video_path),
+        *encode_options,
+        *thread_options,
+        # 结束时在标准输出报告 total_size，省去编码后再 stat 输出文件
+        *FFMPEG_PROGRESS_OPTIONS,
+        str(output_webp_path),
+    ]
+
+
+def build_batched_ffmpeg_command(ffmpeg_exe_path: str,
+                                 jobs: List["WebpJob"],
+                                 target_fps: int,
+                                 threads_per_job: int = 0) -> List[str]:
+    """
+    构建一次处理多个文件的 FFmpeg 命令：多个 -i 输入，经 filter_complex
+    各自截取时长并设置帧率后，分别映射到对应的输出文件
+    """
+    thread_options = _thread_options(threads_per_job)
+    command = [ffmpeg_exe_path, *_FFMPEG_PREFIX]
+    for job in jobs:
+        # 输入级截取：每个源视频只读取所需时长
+        command.extend([*thread_options, *_INPUT_TRIM_OPTIONS, "-i", str(job.source_video)])
+    
+    filter_parts = [
+        f"[{index}:v]trim=duration={VIDEO_DURATION_FOR_WEBP},setpts=PTS-STARTPTS,{_fps_filter(target_fps)}[v{index}]"
+        for index in range(len(jobs))
+    ]
+    command.extend(["-filter_complex", ";".join(filter_parts)])
+    
+    # 输出选项对每个输出文件单独生效，因此逐个输出重复编码参数
+    for index, job in enumerate(jobs):
+        command.extend(["-map", f"[v{index}]"])
+        command.extend(_FFMPEG_ENCODE_OPTS)
+        command.extend(thread_options)
+        command.append(str(job.path))
     return command
 
 
-def scan_webp_files(root_dir_path: pathlib.Path, size_threshold_bytes: float) -> List[Dict]:
-    """预扫描符合条件的 WebP 文件"""
-    print("\n🔍 正在扫描 WebP 文件...")
-    webp_files_info = []
-    total_scanned = 0
+class WebpJob:
+    """待重新生成的 WebP 文件（使用 __slots__，大量文件时每项内存更小）"""
+    __slots__ = ('path', 'size', 'base_name', 'source_video')
     
-    for dirpath_str, _, filenames in os.walk(root_dir_path):
-        current_dir_path = pathlib.Path(dirpath_str)
-        for filename in filenames:
-            webp_path = current_dir_path / filename
-            if webp_path.suffix.lower() == ".webp" and webp_path.is_file():
-                total_scanned += 1
+    def __init__(self, path: pathlib.Path, size: int, base_name: str,
+                 source_video: Optional[pathlib.Path]):
+        self.path = path
+        self.size = size
+        self.base_name = base_name
+        self.source_video = source_video
+
+
+def scan_single_directory(dir_path: str, size_threshold_bytes: float) -> Tuple[List[str], List[WebpJob], int]:
+    """
+    扫描单个目录（不递归），在线程池中执行
+    文件类型和大小直接取自目录项缓存，仅对超过阈值的文件构造 Path 对象；
+    目录的文件清单只读取一次，用于查找同目录下的源视频
+    返回 (子目录路径列表, 超过阈值的 WebP 任务列表, 扫描到的 WebP 数量)
+    """
+    subdirs = []
+    webp_jobs = []
+    total_scanned = 0
+    # 当前目录的视频文件清单 {小写文件名: 路径} 及超过阈值的 WebP 候选
+    files_in_dir = {}
+    oversized_webps = []
+    try:
+        with os.scandir(dir_path) as dir_entries:
+            for entry in dir_entries:
                 try:
-                    file_size = webp_path.stat().st_size
-                    if file_size > size_threshold_bytes:
-                        base_name = webp_path.stem
-                        source_video = find_original_video_file(current_dir_path, base_name)
-                        
-                        webp_files_info.append({
-                            'path': webp_path,
-                            'size': file_size,
-                            'base_name': base_name,
-                            'source_video': source_video
-                        })
+                    # 不进入符号链接目录，避免循环
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    name = entry.name
+                    stem, dot, extension = name.rpartition('.')
+                    if not dot:
+                        continue
+                    extension = extension.lower()
+                    if extension == _WEBP_EXTENSION:
+                        if not entry.is_file():
+                            continue
+                        total_scanned += 1
+                        file_size = entry.stat().st_size
+                        if file_size > size_threshold_bytes:
+                            oversized_webps.append((entry.path, stem, file_size))
+                    elif extension in _VIDEO_EXTENSION_SET and entry.is_file():
+                        # 只记录视频文件，供查找源视频使用
+                        files_in_dir[name.lower()] = entry.path
                 except OSError:
                     continue
+    except OSError:
+        return subdirs, webp_jobs, total_scanned
     
-    print(f"✅ 扫描完成: 总共扫描 {total_scanned} 个 WebP 文件")
-    print(f"   找到 {len(webp_files_info)} 个超过阈值的 WebP 文件")
-    
-    return webp_files_info
+    # 源视频可能在 WebP 之后才被遍历到，因此整个目录读完后再查找
+    for webp_path_str, base_name, file_size in oversized_webps:
+        webp_jobs.append(WebpJob(
+            pathlib.Path(webp_path_str), file_size, base_name,
+            find_original_video_file(files_in_dir, base_name)
+        ))
+    return subdirs, webp_jobs, total_scanned
 
 
-def display_scan_results(webp_files_info: List[Dict], size_threshold_bytes: float):
-    """显示扫描结果"""
-    if not webp_files_info:
-        print(f"\n📊 扫描结果: 未找到超过 {get_human_readable_size(int(size_threshold_bytes))} 的 WebP 文件。")
-        return False
+def iter_webp_files(root_dir_path: pathlib.Path, size_threshold_bytes: float,
+                    scan_stats: Dict[str, int]) -> Iterator[WebpJob]:
+    """
+    扫描超过阈值的 WebP 文件（生成器），每读完一个目录就产出其中的结果
+    多个目录由线程池并发读取：每完成一个目录就把其子目录提交为新任务，
+    没有未完成的任务时遍历结束；扫描到的 WebP 总数累计到 scan_stats['scanned']
+    """
+    with ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS) as executor:
+        pending = {executor.submit(scan_single_directory, str(root_dir_path), size_threshold_bytes)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                subdirs, dir_webp_jobs, dir_scanned = future.result()
+                scan_stats['scanned'] += dir_scanned
+                for subdir in subdirs:
+                    pending.add(executor.submit(scan_single_directory, subdir, size_threshold_bytes))
+                for webp_job in dir_webp_jobs:
+                    yield webp_job
+            if stop_event.is_set():
+                # 已中断：不再提交新目录，等待已提交的扫描自然结束
+                for future in pending:
+                    future.cancel()
+                return
+
+
+def start_webp_scanner(root_dir_path: pathlib.Path, size_threshold_bytes: float,
+                       scan_stats: Dict[str, int], maxsize: int) -> "queue.Queue":
+    """
+    在后台线程中扫描 WebP 文件，并把结果放入有界队列
+    扫描与处理形成生产者/消费者流水线，内存中只保留队列容量内的待处理任务；
+    扫描结束后放入 _SCAN_DONE 标记
+    """
+    job_queue = queue.Queue(maxsize=maxsize)
     
+    def _producer():
+        try:
+            for webp_job in iter_webp_files(root_dir_path, size_threshold_bytes, scan_stats):
+                job_queue.put(webp_job)
+        except Exception as e:
+            print(f"❌ 扫描文件夹时发生错误: {e}")
+        finally:
+            job_queue.put(_SCAN_DONE)
+    
+    # 守护线程：用户中断时不会阻止程序退出
+    scanner = threading.Thread(target=_producer, name="webp-scanner", daemon=True)
+    scanner.start()
+    return job_queue
+
+
+def display_scan_results(total_scanned: int, oversized_count: int, missing_source_count: int,
+                         size_threshold_bytes: float) -> None:
+    """显示扫描结果汇总"""
     print(f"\n📊 扫描结果汇总:")
     print("=" * 60)
+    print(f"🔍 总共扫描 {total_scanned} 个 WebP 文件")
+    if oversized_count == 0:
+        print(f"📁 未找到超过 {get_human_readable_size(int(size_threshold_bytes))} 的 WebP 文件。")
+        return
     
-    has_source_count = sum(1 for info in webp_files_info if info['source_video'])
-    no_source_count = len(webp_files_info) - has_source_count
-    
-    print(f"📁 总共找到 {len(webp_files_info)} 个超过阈值的 WebP 文件")
-    print(f"📁 有源视频文件: {has_source_count} 个")
-    print(f"❌ 无源视频文件: {no_source_count} 个")
-    
-    if no_source_count > 0:
-        print(f"\n⚠️  警告: 有 {no_source_count} 个 WebP 文件无法找到对应的源视频文件")
+    print(f"📁 总共找到 {oversized_count} 个超过阈值的 WebP 文件")
+    print(f"📁 有源视频文件: {oversized_count - missing_source_count} 个")
+    print(f"❌ 无源视频文件: {missing_source_count} 个")
     
-    print("\n📄 详细列表:")
-    print("-" * 60)
-    for i, info in enumerate(webp_files_info, 1):
-        status = "✅" if info['source_video'] else "❌"
-        print(f"{i:3d}. {status} {info['path'].name} ({get_human_readable_size(info['size'])})")
-        if info['source_video']:
-            print(f"     源视频: {info['source_video'].name}")
-        else:
-            print(f"     源视频: 未找到")
-        print()
-    
-    return True
+    if missing_source_count > 0:
+        print(f"\n⚠️  警告: 有 {missing_source_count} 个 WebP 文件无法找到对应的源视频文件")
 
 
 def confirm_processing() -> bool:
@@ -313,7 +583,7 @@ def confirm_processing() -> bool:
     print("⚠️  注意: 处理过程将直接覆盖现有的 WebP 文件，建议先备份数据！")
     
     while True:
-        choice = input("\n是否继续处理? (y/n): ").strip().lower()
+        choice = prompt_user("\n是否继续处理? (y/n): ").strip().lower()
         if choice in ['y', 'yes', '是', '继续']:
             return True
         elif choice in ['n', 'no', '否', '取消']:
@@ -322,115 +592,240 @@ def confirm_processing() -> bool:
             print("❌ 请输入 y 或 n")
 
 
-def process_webp_regeneration(webp_files_info: List[Dict], target_fps: int) -> Tuple[int, int]:
-    """批量处理 WebP 文件重新生成"""
+def parse_progress_total_size(progress_output: Optional[bytes]) -> Optional[int]:
+    """从 -progress 输出中取最后一个 total_size（输出文件字节数），解析失败返回 None"""
+    if not progress_output:
+        return None
+    position = progress_output.rfind(_TOTAL_SIZE_KEY)
+    if position < 0:
+        return None
+    value = progress_output[position + len(_TOTAL_SIZE_KEY):].split(b"\n", 1)[0].strip()
+    try:
+        total_size = int(value)
+    except ValueError:
+        # 尚未写出任何数据时为 N/A
+        return None
+    return total_size if total_size > 0 else None
+
+
+def run_ffmpeg_command(ffmpeg_command: List[str], timeout: float, capture_progress: bool = False) -> Dict:
+    """
+    运行一条 FFmpeg 命令并登记到活动进程集合，便于中断时统一终止
+    capture_progress 为 True 时读取标准输出中的 -progress 报告
+    返回字典: returncode / stderr / timed_out / error / output_size
+    """
+    outcome = {'returncode': None, 'stderr': '', 'timed_out': False, 'error': None, 'output_size': None}
+    try:
+        # 使用 Popen 以便能够在中断时终止进程；标准输出只在需要进度报告时读取，
+        # 标准错误以字节读取，仅在失败时才解码
+        process = subprocess.Popen(
+            ffmpeg_command,
+            stdout=subprocess.PIPE if capture_progress else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            **_NEW_PROCESS_GROUP_KWARGS
+        )
+        with process_lock:
+            active_ffmpeg_processes.add(process)
+        
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+            outcome['returncode'] = process.returncode
+            if process.returncode == 0:
+                outcome['output_size'] = parse_progress_total_size(stdout)
+            if process.returncode != 0 and stderr:
+                outcome['stderr'] = stderr.decode('utf-8', errors='replace')
+        except subprocess.TimeoutExpired:
+            outcome['timed_out'] = True
+            terminate_ffmpeg_process(process)
+            process.communicate()
+        finally:
+            with process_lock:
+                active_ffmpeg_processes.discard(process)
+    except Exception as e:
+        outcome['error'] = str(e)
+    return outcome
+
+
+def _build_result(file_info: WebpJob, outcome: Dict) -> Dict:
+    """
+    根据 FFmpeg 运行结果生成单个文件的处理结果
+    新文件大小优先取 FFmpeg 报告的输出字节数，无法取得时才 stat 输出文件
+    """
+    result = {'file_info': file_info, 'new_size': outcome.get('output_size'), 'skipped': False}
+    result.update(outcome)
+    if result['returncode'] == 0 and result['new_size'] is None:
+        try:
+            result['new_size'] = file_info.path.stat().st_size
+        except OSError as e:
+            result['error'] = f"无法获取新文件大小: {e}"
+    return result
+
+
+def regenerate_single_webp(file_info: WebpJob, target_fps: int, threads_per_job: int) -> Dict:
+    """
+    重新生成单个 WebP 文件
+    只负责运行 FFmpeg 并返回结果，输出统一由主线程打印，避免并发输出交错
+    返回字典: returncode / new_size / stderr / timed_out / error / skipped
+    """
+    if stop_event.is_set():
+        return {'file_info': file_info, 'skipped': True}
+    
+    ffmpeg_command = build_ffmpeg_command_for_regeneration(
+        FFMPEG_PATH, file_info.source_video, file_info.path, target_fps, threads_per_job
+    )
+    return _build_result(file_info, run_ffmpeg_command(ffmpeg_command, FFMPEG_TIMEOUT_SECONDS,
+                                                       capture_progress=True))
+
+
+def regenerate_webp_batch(batch: List[WebpJob], target_fps: int, threads_per_job: int) -> List[Dict]:
+    """
+    重新生成一批 WebP 文件（在线程池中执行）
+    多个文件合并为一次 FFmpeg 调用；整批失败时无法判断是哪个输出出错，
+    因此逐个文件单独重试，保证每个文件都有准确的结果
+    """
+    if len(batch) == 1:
+        return [regenerate_single_webp(batch[0], target_fps, threads_per_job)]
+    if stop_event.is_set():
+        return [{'file_info': file_info, 'skipped': True} for file_info in batch]
+    
+    ffmpeg_command = build_batched_ffmpeg_command(FFMPEG_PATH, batch, target_fps, threads_per_job)
+    outcome = run_ffmpeg_command(ffmpeg_command, FFMPEG_TIMEOUT_SECONDS * len(batch))
+    if outcome['returncode'] == 0:
+        # 批量命令的 total_size 是所有输出之和，无法分摊到单个文件，改为逐个 stat
+        outcome['output_size'] = None
+        return [_build_result(file_info, outcome) for file_info in batch]
+    
+    return [regenerate_single_webp(file_info, target_fps, threads_per_job) for file_info in batch]
+
+
+def report_regeneration_result(result: Dict, index: int, total: Union[int, str]) -> bool:
+    """打印单个文件的处理结果，返回是否成功"""
+    file_info = result['file_info']
+    webp_path = file_info.path
+    original_size = file_info.size
+    
+    print(f"\n[{index}/{total}] 完成: {webp_path.name}")
+    print(f"  原始大小: {get_human_readable_size(original_size)}")
+    print(f"  源视频: {file_info.source_video.name}")
+    
+    if result['timed_out']:
+        print(f"  ❌ 超时 (超过 {FFMPEG_TIMEOUT_SECONDS} 秒)")
+        return False
+    if result['returncode'] == 0:
+        new_size = result['new_size']
+        if new_size is None:
+            print(f"  ❌ {result['error']}")
+            return True  # 仍然算作成功，因为 FFmpeg 返回成功
+        size_change = new_size - original_size
+        # 原文件为 0 字节时无法计算百分比
+        percent_text = f" ({size_change / original_size * 100:+.1f}%)" if original_size > 0 else ""
+        
+        print(f"  ✅ 成功! 新大小: {get_human_readable_size(new_size)}")
+        if size_change > 0:
+            print(f"     大小增加: +{get_human_readable_size(size_change)}{percent_text}")
+        else:
+            print(f"     大小减少: {get_human_readable_size(abs(size_change))}{percent_text}")
+        return True
+    if result['error']:
+        print(f"  ❌ 处理失败: {result['error']}")
+        return False
+    
+    print(f"  ❌ FFmpeg 失败 (返回码: {result['returncode']})")
+    if result['stderr']:
+        print(f"     错误信息: {result['stderr'].strip()[:200]}")
+    return False
+
+
+def process_webp_regeneration(job_queue: "queue.Queue", target_fps: int,
+                              workers: int, threads_per_job: int,
+                              batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[int, int, int, int]:
+    """
+    批量处理 WebP 文件重新生成（多个 FFmpeg 任务并发执行）
+    从扫描队列边取边处理，同时在途的批次数不超过 2 倍并发数，内存占用与文件总数无关
+    返回 (成功数, 失败数, 超过阈值的文件数, 缺少源视频的文件数)
+    """
     success_count = 0
     fail_count = 0
-    processable_files = [info for info in webp_files_info if info['source_video']]
-    
-    if not processable_files:
-        print("\n❌ 没有可处理的文件（所有文件都缺少源视频）")
-        return 0, 0
+    oversized_count = 0
+    missing_source_count = 0
+    max_in_flight = workers * 2
     
-    print(f"\n🔄 开始处理 {len(processable_files)} 个文件...")
+    print(f"\n🔄 开始处理（边扫描边处理）...")
+    print(f"   并发任务数: {workers} | 每个任务 FFmpeg 线程数: {threads_per_job} | 每批文件数: {batch_size}")
     print("=" * 60)
     
     start_time = time.time()
     
-    for index, file_info in enumerate(processable_files, 1):
-        webp_path = file_info['path']
-        source_video_path = file_info['source_video']
-        original_size = file_info['size']
-        
-        print(f"\n[{index}/{len(processable_files)}] 处理: {webp_path.name}")
-        print(f"  原始大小: {get_human_readable_size(original_size)}")
-        print(f"  源视频: {source_video_path.name}")
-        
-        # 构建 FFmpeg 命令
-        ffmpeg_command = build_ffmpeg_command_for_regeneration(
-            FFMPEG_PATH, source_video_path, webp_path, target_fps
-        )
-        
-        try:
-            # 执行 FFmpeg 命令
-            print(f"  正在重新生成...")
-            
-            # 使用 Popen 以便能够控制进程
-            with process_lock:
-                global current_ffmpeg_process
-                current_ffmpeg_process = subprocess.Popen(
-                    ffmpeg_command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace'
-                )
-            
-            try:
-                stdout, stderr = current_ffmpeg_process.communicate(timeout=FFMPEG_TIMEOUT_SECONDS)
-                returncode = current_ffmpeg_process.returncode
-            finally:
-                with process_lock:
-                    current_ffmpeg_process = None
-            
-            if returncode == 0:
-                # 检查新文件大小
+    with ThreadPoolExecutor(max_workers=workers,
+                            initializer=make_worker_affinity_initializer(threads_per_job)) as executor:
+        index = 0
+        pending = set()
+        batch = []
+        scan_done = False
+        last_output_time = time.time()
+        while True:
+            # 从扫描队列取任务组批提交；没有在途任务时短暂阻塞等待扫描结果
+            while not scan_done and len(pending) < max_in_flight:
                 try:
-                    new_size = webp_path.stat().st_size
-                    size_change = new_size - original_size
-                    size_change_percent = (size_change / original_size) * 100
-                    
-                    print(f"  ✅ 成功! 新大小: {get_human_readable_size(new_size)}")
-                    if size_change > 0:
-                        print(f"     大小增加: +{get_human_readable_size(size_change)} (+{size_change_percent:.1f}%)")
+                    if pending:
+                        webp_job = job_queue.get_nowait()
+                    else:
+                        webp_job = job_queue.get(timeout=RESULT_POLL_INTERVAL)
+                except queue.Empty:
+                    break
+                if webp_job is _SCAN_DONE:
+                    scan_done = True
+                else:
+                    oversized_count += 1
+                    if webp_job.source_video is None:
+                        missing_source_count += 1
+                        print(f"\n⚠️  跳过 (未找到源视频): {webp_job.path.name} "
+                              f"({get_human_readable_size(webp_job.size)})")
                     else:
-                        print(f"     大小减少: {get_human_readable_size(abs(size_change))} ({size_change_percent:.1f}%)")
-                    
+                        batch.append(webp_job)
+                if batch and (len(batch) >= batch_size or scan_done):
+                    pending.add(executor.submit(regenerate_webp_batch, batch, target_fps, threads_per_job))
+                    batch = []
+            
+            if not pending:
+                if scan_done:
+                    break
+                continue
+            
+            # 带超时地等待：Windows 下无超时的锁等待无法被 Ctrl+C 打断，
+            # 同时利用等待间隙输出心跳，避免长任务期间界面长时间无输出
+            done, pending = wait(pending, timeout=RESULT_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            now = time.time()
+            if not done:
+                if now - last_output_time >= HEARTBEAT_INTERVAL:
+                    print(f"  ⏳ 正在处理... 已完成 {index} 个，已用时 {now - start_time:.1f}秒")
+                    last_output_time = now
+                continue
+            last_output_time = now
+            total = oversized_count - missing_source_count
+            for result in (r for future in done for r in future.result()):
+                if result['skipped']:
+                    continue
+                index += 1
+                if report_regeneration_result(result, index, total if scan_done else "?"):
                     success_count += 1
-                except OSError as e:
-                    print(f"  ❌ 无法获取新文件大小: {e}")
-                    success_count += 1  # 仍然算作成功，因为 FFmpeg 返回成功
-            else:
-                print(f"  ❌ FFmpeg 失败 (返回码: {returncode})")
-                if stderr:
-                    print(f"     错误信息: {stderr.strip()[:200]}")
-                fail_count += 1
+                else:
+                    fail_count += 1
                 
-        except subprocess.TimeoutExpired:
-            print(f"  ❌ 超时 (超过 {FFMPEG_TIMEOUT_SECONDS} 秒)")
-            # 终止超时的进程
-            with process_lock:
-                if current_ffmpeg_process and current_ffmpeg_process.poll() is None:
-                    try:
-                        current_ffmpeg_process.terminate()
-                        try:
-                            current_ffmpeg_process.wait(timeout=5)
-                        except subprocess.TimeoutExpired:
-                            current_ffmpeg_process.kill()
-                            current_ffmpeg_process.wait()
-                    except Exception as e:
-                        print(f"     终止进程时出错: {e}")
-                    finally:
-                        current_ffmpeg_process = None
-            fail_count += 1
-        except Exception as e:
-            print(f"  ❌ 处理失败: {e}")
-            fail_count += 1
-        
-        # 显示进度
-        progress = (index / len(processable_files)) * 100
-        elapsed_time = time.time() - start_time
-        if index > 0:
-            avg_time_per_file = elapsed_time / index
-            remaining_files = len(processable_files) - index
-            estimated_remaining_time = avg_time_per_file * remaining_files
-            print(f"  进度: {progress:.1f}% | 剩余时间: {estimated_remaining_time:.1f}秒")
+                # 显示进度（扫描结束后总数才确定）；复用本轮取得的时间
+                elapsed_time = now - start_time
+                if scan_done:
+                    progress = (index / total) * 100
+                    avg_time_per_file = elapsed_time / index
+                    estimated_remaining_time = avg_time_per_file * (total - index)
+                    print(f"  进度: {progress:.1f}% | 剩余时间: {estimated_remaining_time:.1f}秒")
+                else:
+                    print(f"  进度: 已完成 {index} 个，已发现 {total} 个（扫描仍在进行）| 已用时: {elapsed_time:.1f}秒")
     
     total_time = time.time() - start_time
     print(f"\n🏁 处理完成! 总用时: {total_time:.2f}秒")
     
-    return success_count, fail_count
+    return success_count, fail_count, oversized_count, missing_source_count
 
 
 def display_final_results(success_count: int, fail_count: int, total_files: int):
@@ -454,8 +849,38 @@ def display_final_results(success_count: int, fail_count: int, total_files: int)
         print(f"   • FFmpeg 配置问题")
 
 
+def _bounded_int(value: str, minimum: int, maximum: int) -> int:
+    """argparse 类型校验：整数必须在 [minimum, maximum] 范围内"""
+    number = int(value)
+    if not minimum <= number <= maximum:
+        raise argparse.ArgumentTypeError(f"取值必须在 {minimum}-{maximum} 之间")
+    return number
+
+
+def parallelism_value(value: str) -> int:
+    """argparse 类型校验：并发参数必须在 [1, 64] 范围内"""
+    return _bounded_int(value, MIN_PARALLELISM, MAX_PARALLELISM)
+
+
+def batch_size_value(value: str) -> int:
+    """argparse 类型校验：每批文件数必须在 [1, 32] 范围内"""
+    return _bounded_int(value, 1, MAX_BATCH_SIZE)
+
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="从原始视频批量重新生成超过指定大小的 WebP 文件。")
+    parser.add_argument("--workers", type=parallelism_value, default=None,
+                        help="并发执行的 FFmpeg 任务数 (1-64)，默认按 CPU 核心数推算")
+    parser.add_argument("--threads-per-job", type=parallelism_value,
+                        default=os.environ.get(FFMPEG_THREADS_ENV_VAR),
+                        help=f"每个 FFmpeg 任务使用的线程数 (1-64)，默认读取环境变量 "
+                             f"{FFMPEG_THREADS_ENV_VAR}，未设置时按 CPU 核心数推算")
+    parser.add_argument("--batch-size", type=batch_size_value, default=DEFAULT_BATCH_SIZE,
+                        help=f"每个 FFmpeg 进程处理的文件数 (1-{MAX_BATCH_SIZE})，默认 {DEFAULT_BATCH_SIZE}")
+    args = parser.parse_args()
+    workers, threads_per_job = resolve_parallelism(args.workers, args.threads_per_job)
+    
     # 注册信号处理器
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -504,54 +929,38 @@ def main():
             print(f"❌ 参数读取错误: {e}")
             return
         
-        # 3. 扫描文件
-        webp_files_info = scan_webp_files(root_dir_path, size_threshold_bytes)
+        # 3. 启动后台扫描，结果经有界队列交给处理流程
+        print("\n🔍 正在扫描 WebP 文件（边扫描边处理）...")
+        scan_stats = {'scanned': 0}
+        job_queue = start_webp_scanner(root_dir_path, size_threshold_bytes, scan_stats,
+                                       maxsize=workers * args.batch_size * 2)
         
-        # 4. 显示扫描结果
-        if not display_scan_results(webp_files_info, size_threshold_bytes):
-            print("\n✅ 没有需要处理的文件，程序结束。")
-            return
-        
-        # 5. 自动确认处理（Web环境下不需要用户交互）
+        # 4. 自动开始处理（Web环境下不需要用户交互）
         print("\n🚀 开始自动处理...")
+        success_count, fail_count, oversized_count, missing_source_count = process_webp_regeneration(
+            job_queue, target_fps, workers, threads_per_job, args.batch_size
+        )
         
-        # 6. 开始处理
-        success_count, fail_count = process_webp_regeneration(webp_files_info, target_fps)
+        # 5. 显示扫描汇总
+        display_scan_results(scan_stats['scanned'], oversized_count, missing_source_count, size_threshold_bytes)
+        if oversized_count == 0:
+            print("\n✅ 没有需要处理的文件，程序结束。")
+            return
+        if oversized_count == missing_source_count:
+            print("\n❌ 没有可处理的文件（所有文件都缺少源视频）")
         
-        # 7. 显示最终结果
-        display_final_results(success_count, fail_count, len(webp_files_info))
+        # 6. 显示最终结果
+        display_final_results(success_count, fail_count, oversized_count)
         
     except KeyboardInterrupt:
         print("\n\n⚠️  用户中断操作 (Ctrl+C)")
-        # 确保清理当前进程
-        with process_lock:
-            if current_ffmpeg_process and current_ffmpeg_process.poll() is None:
-                try:
-                    current_ffmpeg_process.terminate()
-                    current_ffmpeg_process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    current_ffmpeg_process.kill()
-                    current_ffmpeg_process.wait()
-                except Exception:
-                    pass
-                finally:
-                    current_ffmpeg_process = None
+        # 确保清理所有正在运行的进程
+        terminate_active_ffmpeg_processes()
         print("程序已停止。")
     except Exception as e:
         print(f"\n❌ 程序执行过程中发生未知错误: {e}")
-        # 确保清理当前进程
-        with process_lock:
-            if current_ffmpeg_process and current_ffmpeg_process.poll() is None:
-                try:
-                    current_ffmpeg_process.terminate()
-                    current_ffmpeg_process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    current_ffmpeg_process.kill()
-                    current_ffmpeg_process.wait()
-                except Exception:
-                    pass
-                finally:
-                    current_ffmpeg_process = None
+        # 确保清理所有正在运行的进程
+        terminate_active_ffmpeg_processes()
         print("建议检查输入参数和系统配置。")
 
 
@@ -1,9 +1,13 @@
 import os
+import sys
 import subprocess
 import shutil  # 虽然未使用，但保留原导入
 import pathlib
 import time  # 从其他脚本看，可能需要暂停，但此脚本中当前未使用
-from typing import Union, Tuple, List, Optional  # 导入 Union, Tuple, List, Optional
+from collections import namedtuple
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Union, Tuple, List, Optional, Iterator, Dict  # 导入 Union, Tuple, List, Optional, Iterator, Dict
 
 # ==============================================================================
 # 脚本功能核心备注 (Script Core Functionality Notes)
@@ -31,7 +35,8 @@ from typing import Union, Tuple, List, Optional  # 导入 Union, Tuple, List, Op
 #         i.   根据 .webp 文件的名称（去除 .webp 后缀）推断原始视频的基础文件名。
 #              (例如，从 "IMG_123.JPG.webp" 得到 "IMG_123.JPG"作为基础名)
 #         ii.  在同一目录下，使用 `ORIGINAL_VIDEO_EXTENSIONS` 列表尝试查找对应的原始视频文件
-#              (例如，查找 "IMG_123.JPG.mp4", "IMG_123.JPG.mov" 等)。
+#              (例如，查找 "IMG_123.JPG.mp4", "IMG_123.JPG.mov" 等，扩展名不区分大小写)。
+#              每个目录只读取一次，建立文件名索引后查找。
 #         iii. 如果找到原始视频文件：
 #              - 使用 FFmpeg 从原始视频文件截取指定时长 (如前3秒)。
 #              - 应用预设的 `BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO` 和用户指定的新帧率，
@@ -46,6 +51,9 @@ from typing import Union, Tuple, List, Optional  # 导入 Union, Tuple, List, Op
 #   - `ORIGINAL_VIDEO_EXTENSIONS`: 用于查找原始视频文件的扩展名列表。
 #   - `BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO`: 从视频重新生成 WebP 时的基础 FFmpeg 参数。
 #   - `VIDEO_DURATION_FOR_WEBP`: 从原始视频截取的时长。
+#   - `FFMPEG_THREADS_PER_JOB` / `MAX_PARALLEL_JOBS`: 单个 FFmpeg 的线程数与并行 FFmpeg 进程数。
+#   - `MAX_SOURCES_PER_FFMPEG`: 同一目录下合并到一次 FFmpeg 调用中的原始视频数量上限。
+#   - `USE_HWACCEL_DECODE`: FFmpeg 编译了 hwaccel 方法时，是否尝试使用 -hwaccel auto 解码原始视频。
 #
 # 注意事项 (Important Notes):
 #   - 依赖 FFmpeg：确保 FFmpeg 已正确安装。
@@ -69,23 +77,90 @@ BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO = [
 ]
 VIDEO_DURATION_FOR_WEBP = "3"  # 秒
 FFMPEG_TIMEOUT_SECONDS = 180
+# 只输出错误信息、不输出逐帧进度，减少 FFmpeg 的日志格式化以及管道数据量
+FFMPEG_QUIET_OPTIONS = ["-loglevel", "error", "-nostats"]
+# 尽力而为地让 FFmpeg 自动选择硬件解码器 (-hwaccel auto)：FFmpeg 编译了 hwaccel 方法并不代表本机有可用的硬件，
+# 没有可用设备或解码失败时 FFmpeg 会自动回退到软件解码。
+# 解码后的帧仍下载回内存，以便 fps 滤镜和 libwebp 编码（仍在 CPU 上）直接使用。
+USE_HWACCEL_DECODE = True
+# 每个 FFmpeg 进程的线程上限。多个 FFmpeg 并行运行时，限制单进程线程数可避免 CPU 过度订阅。
+FFMPEG_THREADS_PER_JOB = "2"
+# 并行运行的 FFmpeg 进程数上限
+MAX_PARALLEL_JOBS = os.cpu_count() or 4
+# 同一目录下的多个原始视频合并到一次 FFmpeg 调用中处理，每次调用最多包含的原始视频数。
+# 合并可以省去重复的进程启动开销（Windows 上尤其明显）；设为 1 则每个原始视频单独调用一次。
+MAX_SOURCES_PER_FFMPEG = 4
 
 
 # --- /配置 ---
 
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+# 小写扩展名 -> 在 ORIGINAL_VIDEO_EXTENSIONS 中的优先级（越小越优先），导入时计算一次；
+# 同时充当扩展名集合，判断是否为视频只需一次哈希查找
+_VIDEO_EXT_PRIORITY = {ext.lower(): i for i, ext in enumerate(ORIGINAL_VIDEO_EXTENSIONS)}
+# 缓存的目录视频索引数量上限
+VIDEO_INDEX_CACHE_SIZE = 1024
+
+
+def _split_vf_option(options: List[str]) -> Tuple[List[str], List[str]]:
+    """把参数列表拆成 (不含 -vf 的其余参数, -vf 中除 fps 以外的滤镜列表)。"""
+    other_options = []
+    vf_filters = []
+    option_iter = iter(options)
+    for opt in option_iter:
+        if opt == "-vf":
+            vf_value = next(option_iter, "")
+            vf_filters.extend(f.strip() for f in vf_value.split(',')
+                              if f.strip() and not f.strip().startswith("fps="))
+        else:
+            other_options.append(opt)
+    return other_options, vf_filters
+
+
+# BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO 是常量，导入时拆分一次：
+# 其中若含 -vf，其滤镜会与目标帧率的 fps 滤镜合并，而不必在每次构建命令时重新解析。
+_BASE_OPTIONS_WITHOUT_VF, _BASE_VF_FILTERS = _split_vf_option(BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO)
+# 每个输出共用的参数（-vf 之前的部分）
+_OUTPUT_OPTIONS = ["-t", VIDEO_DURATION_FOR_WEBP, *_BASE_OPTIONS_WITHOUT_VF, "-threads", FFMPEG_THREADS_PER_JOB]
+
 def get_human_readable_size(size_bytes: Optional[int]) -> str:  # 使用 Optional[int] 替代 int | None
     """将字节大小转换为人类可读的格式 (B, KB, MB, GB)"""
     if size_bytes is None:
         return "N/A"
-    if size_bytes == 0:
+    if size_bytes <= 0:
         return "0 B"
-    size_name = ("B", "KB", "MB", "GB", "TB")
-    i = 0
-    size_bytes_float = float(size_bytes)
-    while size_bytes_float >= 1024 and i < len(size_name) - 1:
-        size_bytes_float /= 1024.0
-        i += 1
-    return f"{size_bytes_float:.2f} {size_name[i]}"
+    # 每 10 位二进制对应一级单位，由位长度直接算出单位下标，只做一次除法
+    unit_index = min((size_bytes.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (unit_index * 10)):.2f} {SIZE_UNITS[unit_index]}"
+
+
+@lru_cache(maxsize=None)
+def detect_hwaccel_methods(ffmpeg_exe_path: str) -> Tuple[str, ...]:
+    """
+    运行一次 `ffmpeg -hwaccels` 并缓存结果，返回 FFmpeg 编译时支持的 hwaccel 方法列表（无法获取时为空）。
+    列表只说明 FFmpeg 支持这些方法，不代表本机有可用的硬件设备。
+    """
+    try:
+        result = subprocess.run([ffmpeg_exe_path, "-hide_banner", "-hwaccels"], capture_output=True,
+                                text=True, encoding='utf-8', errors='replace', timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return ()
+    if result.returncode != 0:
+        return ()
+    methods = []
+    for line in result.stdout.splitlines():
+        line = line.strip()
+        if line and not line.endswith(":"):  # 跳过 "Hardware acceleration methods:" 标题行
+            methods.append(line)
+    return tuple(methods)
+
+
+def write_lines(lines: List[str]) -> None:
+    """把多行输出合并为一次写入并刷新，代替逐行 print，减少输出时的系统调用次数。"""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
 
 def get_valid_folder_path_from_user(prompt_message: str) -> pathlib.Path:
@@ -156,66 +231,237 @@ def get_regeneration_parameters() -> Tuple[float, int]:  # 使用 Tuple
     return size_threshold_bytes, new_fps_val
 
 
+@lru_cache(maxsize=VIDEO_INDEX_CACHE_SIZE)
+def _scan_sources(dir_path: str) -> Dict[str, pathlib.Path]:
+    """
+    用一次 os.scandir 读取目录，建立 "去掉扩展名的文件名 -> 原始视频路径" 的索引。
+    同名的多个视频按 ORIGINAL_VIDEO_EXTENSIONS 中的顺序取优先者。
+    结果按目录缓存，同一目录下的多个 WebP 共用一次扫描。
+    """
+    video_index = {}
+    index_priority = {}
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                name = entry.name
+                dot = name.rfind('.')
+                if dot <= 0:
+                    continue
+                priority = _VIDEO_EXT_PRIORITY.get(name[dot:].lower())
+                if priority is None or not entry.is_file():
+                    continue
+                stem = name[:dot]
+                if stem not in index_priority or priority < index_priority[stem]:
+                    index_priority[stem] = priority
+                    video_index[stem] = pathlib.Path(entry.path)
+    except OSError as e_scan:
+        print(f"警告: 无法读取目录 '{dir_path}' 以查找原始视频: {e_scan}")
+    return video_index
+
+
 def find_original_video_file(webp_dir_path: pathlib.Path, base_name_for_lookup: str) -> Optional[
     pathlib.Path]:  # 使用 Optional
     """
     根据 WebP 文件的基本名称和目录，查找可能的原始视频文件。
     返回找到的原始视频文件的 Path 对象，如果找不到则返回 None。
     """
-    for video_ext in ORIGINAL_VIDEO_EXTENSIONS:
-        potential_video_path = webp_dir_path / (base_name_for_lookup + video_ext)
-        if potential_video_path.is_file():
-            return potential_video_path
-    return None
+    return _scan_sources(str(webp_dir_path)).get(base_name_for_lookup)
 
 
-def build_ffmpeg_command_for_regeneration(ffmpeg_exe_path: str,
-                                          source_video_path: pathlib.Path,
-                                          output_webp_path: pathlib.Path,
-                                          target_fps: int) -> List[str]:  # 使用 List
-    """构建用于从视频重新生成WebP的FFmpeg命令列表。"""
-    command = [
-        ffmpeg_exe_path,
-        "-y",
-        "-i", str(source_video_path),
-        "-t", VIDEO_DURATION_FOR_WEBP,
-    ]
-
-    command.extend(BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO)
-
-    # 简化 -vf 处理：总是添加 fps 滤镜，如果 BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO
-    # 中已有 -vf，则新的 fps 会被追加。如果想更精确控制，需要解析或调整 BASE_OPTIONS。
-    # 一个简单且常见的方法是确保 BASE_WEBP_CONVERSION_OPTIONS_FROM_VIDEO 不包含 fps，然后在这里添加。
-
-    existing_vf_filters = []
-    temp_command = []
-    vf_value_next = False
-
-    # 提取现有的-vf（如果有）并移除它，以便我们可以重新构建它
-    for i, opt in enumerate(command):
-        if opt == "-vf":
-            if i + 1 < len(command):
-                existing_vf_filters.extend(f.strip() for f in command[i + 1].split(',') if f.strip())
-            vf_value_next = True  # 标记下一个元素是-vf的值，即使它已经被处理
-            continue  # 跳过 "-vf" 本身
-        if vf_value_next:
-            vf_value_next = False  # 跳过-vf的值
+def _iter_webp(root_dir: Union[str, os.PathLike]) -> Iterator[os.DirEntry]:
+    """
+    递归遍历目录，产出所有 .webp 文件的 DirEntry。
+    DirEntry 的 is_dir()/is_file()/stat() 结果来自目录读取或被缓存，不会为每个文件重复发起系统调用。
+    """
+    try:
+        with os.scandir(root_dir) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_webp(entry.path)
+                elif entry.name.lower().endswith('.webp') and entry.is_file():
+                    yield entry
+    except OSError as e_scan:
+        print(f"警告: 无法读取目录 '{root_dir}': {e_scan}，跳过。")
+
+
+def _iter_webp_over_threshold(root_dir: Union[str, os.PathLike], size_threshold_bytes: float,
+                              status_counts: Dict[str, int]) -> Iterator[Tuple[os.DirEntry, int]]:
+    """
+    递归遍历目录，只产出大小超过阈值的 .webp 文件 (DirEntry, 大小)。
+    大小直接取自 DirEntry 缓存的 stat；未超过阈值或无法读取大小的文件在此计入 status_counts
+    （'scanned' / 'skipped_size' / 'failed'）后直接跳过，不再进入后续处理与逐文件输出。
+    """
+    for webp_entry in _iter_webp(root_dir):
+        status_counts['scanned'] += 1
+        try:
+            size_bytes = webp_entry.stat().st_size
+        except OSError as e_stat:
+            print(f"\n错误: 无法获取文件 '{webp_entry.path}' 的大小: {e_stat}, 跳过。")
+            status_counts['failed'] += 1
+            continue
+        if size_bytes <= size_threshold_bytes:
+            status_counts['skipped_size'] += 1
             continue
-        temp_command.append(opt)  # 保留其他选项
+        yield webp_entry, size_bytes
 
-    command = temp_command
 
-    # 从现有滤镜中移除任何旧的fps设置（如果存在）
-    final_filters = [f for f in existing_vf_filters if not f.startswith("fps=")]
+def build_ffmpeg_command_for_regeneration(ffmpeg_exe_path: str,
+                                          sources: List[Tuple[pathlib.Path, List[pathlib.Path]]],
+                                          target_fps: int, hwaccel: bool = False) -> List[str]:  # 使用 List
+    """
+    构建用于从视频重新生成WebP的FFmpeg命令列表。
+    sources 为 (原始视频, [输出 WebP, ...]) 的列表：每个原始视频作为一个输入只解码一次，
+    每个输出通过 -map 绑定到自己的输入，并重复一组输出参数，所有输出由同一个 FFmpeg 进程生成。
+    hwaccel 为 True 时为每个输入加上 -hwaccel auto，使用硬件解码。
+    """
+    output_options = [*_OUTPUT_OPTIONS, "-vf", ",".join([*_BASE_VF_FILTERS, f"fps={target_fps}"])]
+    command = [ffmpeg_exe_path, *FFMPEG_QUIET_OPTIONS, "-y"]
+    for source_video_path, _ in sources:
+        if hwaccel:
+            command.extend(["-hwaccel", "auto"])
+        command.extend(["-i", str(source_video_path)])
+    for input_index, (_, output_webp_paths) in enumerate(sources):
+        for output_webp_path in output_webp_paths:
+            command.extend(["-map", f"{input_index}:v:0"])
+            command.extend(output_options)
+            command.append(str(output_webp_path))
+    return command
 
-    # 添加新的fps设置
-    final_filters.append(f"fps={target_fps}")
 
-    if final_filters:
-        command.extend(["-vf", ",".join(final_filters)])
+# 单个 WebP 的处理结果。status 取值: regenerated / failed / skipped_size / no_source；
+# messages 为该文件的全部输出行，由主线程统一打印，避免多个线程的输出交错。
+RegenerationResult = namedtuple('RegenerationResult', 'status messages')
+# 待重新生成的 WebP：已通过大小检查并找到了原始视频。
+RegenerationJob = namedtuple('RegenerationJob', 'webp_path original_size source_video messages')
 
-    command.append(str(output_webp_path))
-    return command
+
+def prepare_regeneration(webp_entry: os.DirEntry,
+                         original_webp_size_bytes: int) -> Union[RegenerationResult, RegenerationJob]:
+    """
+    为一个已超过大小阈值的 WebP 文件查找原始视频。
+    找不到时返回 RegenerationResult，需要重新生成时返回 RegenerationJob。
+    """
+    messages = []
+    problematic_webp_path = pathlib.Path(webp_entry.path)
+
+    messages.append(f"\n发现超过阈值的 WebP 文件: {problematic_webp_path}")
+    messages.append(f"  当前 WebP 大小: {get_human_readable_size(original_webp_size_bytes)}")
+
+    base_for_lookup = problematic_webp_path.stem
+    messages.append(f"  将使用基础名 '{base_for_lookup}' 查找原始视频。")
+
+    source_video_path = find_original_video_file(problematic_webp_path.parent, base_for_lookup)
+
+    if not source_video_path:
+        messages.append(f"  错误: 未能找到与基础名 '{base_for_lookup}' 对应的原始视频文件。跳过重新生成。")
+        return RegenerationResult('no_source', messages)
+
+    messages.append(f"  找到对应的原始视频文件: {source_video_path}")
+    return RegenerationJob(problematic_webp_path, original_webp_size_bytes, source_video_path, messages)
+
+
+def check_regenerated_output(job: RegenerationJob, result: subprocess.CompletedProcess) -> RegenerationResult:
+    """FFmpeg 返回 0 后校验单个输出文件，并生成大小对比信息。"""
+    messages = job.messages
+    output_webp_path = job.webp_path
+    original_webp_size_bytes = job.original_size
+
+    # 再次检查文件是否存在且非空，因为FFmpeg有时即使返回0也可能没有成功写入；
+    # 一次 os.stat 同时完成存在性检查和大小读取
+    try:
+        new_webp_size_bytes = os.stat(output_webp_path).st_size
+    except OSError:
+        new_webp_size_bytes = 0
+    if new_webp_size_bytes == 0:
+        messages.append(f"  错误: FFmpeg 声称成功，但新生成的 WebP 文件 '{output_webp_path}' 未找到或为空。")
+        if result.stderr: messages.append(f"    FFmpeg 错误 (stderr):\n{result.stderr.strip()}")
+        return RegenerationResult('failed', messages)
+
+    messages.append(f"  成功从原始视频重新生成 WebP: {output_webp_path}")
+    messages.append(f"    原问题 WebP 大小: {get_human_readable_size(original_webp_size_bytes)}")
+    messages.append(f"    新生成 WebP 大小: {get_human_readable_size(new_webp_size_bytes)}")
+
+    if original_webp_size_bytes > 0:
+        size_change_percentage = ((new_webp_size_bytes - original_webp_size_bytes)
+                                  / original_webp_size_bytes) * 100
+        messages.append(f"    新 WebP 相对于旧 WebP 的大小改变: {size_change_percentage:.2f}%")
+    elif new_webp_size_bytes > 0:
+        messages.append(f"    新 WebP 相对于旧 WebP 的大小改变: N/A (旧 WebP 大小为0)")
+    else:
+        messages.append(f"    新 WebP 相对于旧 WebP 的大小改变: N/A (新旧 WebP 大小均为0)")
+    return RegenerationResult('regenerated', messages)
+
+
+def group_jobs_into_batches(jobs_by_source: Dict[pathlib.Path, List[RegenerationJob]]
+                            ) -> List[List[Tuple[pathlib.Path, List[RegenerationJob]]]]:
+    """
+    把同一目录下的原始视频合并成批次，每批最多 MAX_SOURCES_PER_FFMPEG 个，每批对应一次 FFmpeg 调用。
+    """
+    sources_by_dir = {}
+    for source_video_path, jobs in jobs_by_source.items():
+        sources_by_dir.setdefault(source_video_path.parent, []).append((source_video_path, jobs))
+
+    batches = []
+    for dir_sources in sources_by_dir.values():
+        for i in range(0, len(dir_sources), MAX_SOURCES_PER_FFMPEG):
+            batches.append(dir_sources[i:i + MAX_SOURCES_PER_FFMPEG])
+    return batches
+
+
+def regenerate_batch(batch: List[Tuple[pathlib.Path, List[RegenerationJob]]],
+                     ffmpeg_exe_path: str, new_fps: int, hwaccel: bool = False) -> List[RegenerationResult]:
+    """
+    用一次 FFmpeg 调用重新生成一个批次中的所有 WebP（每个原始视频只解码一次），
+    并为每个 WebP 返回一个结果。不修改任何共享状态，可在线程池中并行调用。
+    包含多个原始视频的批次失败或超时时，无法判断是哪个原始视频出错，
+    且 FFmpeg 可能已覆盖了其他输出，因此逐个原始视频单独重试，保证每个文件都有准确的结果。
+    """
+    jobs = [job for _, source_jobs in batch for job in source_jobs]
+    command_list = build_ffmpeg_command_for_regeneration(
+        ffmpeg_exe_path, [(source, [job.webp_path for job in source_jobs]) for source, source_jobs in batch],
+        new_fps, hwaccel
+    )
+    command_message = f"  执行命令从原始视频重新生成 WebP: {' '.join(command_list)}"
+    if len(jobs) > 1:
+        command_message += f"\n  (本次 FFmpeg 调用合并处理 {len(batch)} 个原始视频、{len(jobs)} 个 WebP)"
+    for job in jobs:
+        job.messages.append(command_message)
+
+    def fail_all(*lines: str) -> List[RegenerationResult]:
+        for job in jobs:
+            job.messages.extend(lines)
+        if len(batch) > 1:
+            for job in jobs:
+                job.messages.append("  批量调用失败，改为逐个原始视频单独调用 FFmpeg 重试。")
+            return [result for item in batch
+                    for result in regenerate_batch([item], ffmpeg_exe_path, new_fps, hwaccel)]
+        return [RegenerationResult('failed', job.messages) for job in jobs]
+
+    # 多个输出的编码时间叠加，超时时间按输出数量放宽
+    timeout_seconds = FFMPEG_TIMEOUT_SECONDS * len(jobs)
+    source_names = ", ".join(str(source) for source, _ in batch)
+    try:
+        # 输出写入文件，stdout 为空，直接丢弃；stderr 在 -loglevel error 下只包含错误信息
+        result = subprocess.run(command_list, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                text=True, check=False, encoding='utf-8', errors='replace',
+                                timeout=timeout_seconds)
+    except subprocess.TimeoutExpired as e_timeout:
+        lines = [f"  错误: FFmpeg 从原始视频重新生成 WebP 超时 ({timeout_seconds}s): {source_names}"]
+        # subprocess.TimeoutExpired.stderr is bytes, so decode it
+        if e_timeout.stderr: lines.append(
+            f"    FFmpeg 错误 (stderr):\n{e_timeout.stderr.decode('utf-8', 'replace').strip()}")
+        return fail_all(*lines)
+    except Exception as e_general:
+        return fail_all(f"  执行 FFmpeg 从原始视频重新生成 WebP 时发生意外错误: {e_general}")
+
+    if result.returncode != 0:
+        lines = [f"  错误: FFmpeg 从原始视频重新生成 WebP 失败 (返回码: {result.returncode})"]
+        if len(batch) > 1:
+            lines.append(f"    (同一批次的原始视频: {source_names})")
+        if result.stderr: lines.append(f"    FFmpeg 错误 (stderr):\n{result.stderr.strip()}")
+        return fail_all(*lines)
+
+    return [check_regenerated_output(job, result) for job in jobs]
 
 
 def regenerate_webp_from_source_video(root_dir_path: pathlib.Path, ffmpeg_exe_path: str,
@@ -223,13 +469,8 @@ def regenerate_webp_from_source_video(root_dir_path: pathlib.Path, ffmpeg_exe_pa
     """
     在指定目录及其子目录中查找 WebP 文件，
     如果文件大小超过阈值，则尝试从其对应的原始视频文件重新生成 WebP。
+    各文件之间互不依赖，使用线程池并行运行多个 FFmpeg 进程。
     """
-    regenerated_count = 0
-    failed_count = 0
-    skipped_size_count = 0
-    no_source_found_count = 0
-    processed_webp_files = 0
-
     print(f"\n开始在目录 '{root_dir_path}' 及其子目录中扫描 WebP 文件以尝试重新生成...")
     print(f"大小阈值: {get_human_readable_size(int(size_threshold_bytes))} (超过此大小的 WebP 会被尝试替换)")
     print(f"新帧率 (用于重新生成): {new_fps} fps")
@@ -237,104 +478,58 @@ def regenerate_webp_from_source_video(root_dir_path: pathlib.Path, ffmpeg_exe_pa
     print(f"尝试查找的原始视频扩展名: {', '.join(ORIGINAL_VIDEO_EXTENSIONS)}")
     print("-" * 30)
 
-    for dirpath_str, _, filenames in os.walk(root_dir_path):
-        current_dir_path = pathlib.Path(dirpath_str)
-        for filename in filenames:
-            problematic_webp_path = current_dir_path / filename
-            if problematic_webp_path.suffix.lower() == ".webp" and problematic_webp_path.is_file():
-                processed_webp_files += 1
-
-                try:
-                    original_webp_size_bytes = problematic_webp_path.stat().st_size
-                except OSError as e_stat:
-                    print(f"\n错误: 无法获取文件 '{problematic_webp_path}' 的大小: {e_stat}, 跳过。")
-                    failed_count += 1
-                    continue
-
-                print(f"\n发现 WebP 文件: {problematic_webp_path}")
-                print(f"  当前 WebP 大小: {get_human_readable_size(original_webp_size_bytes)}")
-
-                if original_webp_size_bytes <= size_threshold_bytes:
-                    print(f"  文件大小未超过阈值 {get_human_readable_size(int(size_threshold_bytes))}，跳过重新生成。")
-                    skipped_size_count += 1
-                    continue
-
-                base_for_lookup = problematic_webp_path.stem
-                print(f"  将使用基础名 '{base_for_lookup}' 查找原始视频。")
-
-                source_video_path = find_original_video_file(current_dir_path, base_for_lookup)
-
-                if not source_video_path:
-                    print(f"  错误: 未能找到与基础名 '{base_for_lookup}' 对应的原始视频文件。跳过重新生成。")
-                    no_source_found_count += 1
-                    continue
-
-                print(f"  找到对应的原始视频文件: {source_video_path}")
-
-                output_webp_path = problematic_webp_path
-
-                command_list = build_ffmpeg_command_for_regeneration(
-                    ffmpeg_exe_path, source_video_path, output_webp_path, new_fps
-                )
-
-                print(f"  执行命令从原始视频重新生成 WebP: {' '.join(command_list)}")
-
-                try:
-                    result = subprocess.run(command_list, capture_output=True, text=True, check=False,
-                                            encoding='utf-8', errors='replace', timeout=FFMPEG_TIMEOUT_SECONDS)
-
-                    if result.returncode == 0:
-                        # 再次检查文件是否存在且非空，因为FFmpeg有时即使返回0也可能没有成功写入
-                        if not output_webp_path.exists() or output_webp_path.stat().st_size == 0:
-                            print(f"  错误: FFmpeg 声称成功，但新生成的 WebP 文件 '{output_webp_path}' 未找到或为空。")
-                            if result.stdout: print(f"    FFmpeg 输出 (stdout):\n{result.stdout.strip()}")
-                            if result.stderr: print(f"    FFmpeg 错误 (stderr):\n{result.stderr.strip()}")
-                            failed_count += 1
-                            continue
-
-                        new_webp_size_bytes = output_webp_path.stat().st_size
-                        print(f"  成功从原始视频重新生成 WebP: {output_webp_path}")
-                        print(f"    原问题 WebP 大小: {get_human_readable_size(original_webp_size_bytes)}")
-                        print(f"    新生成 WebP 大小: {get_human_readable_size(new_webp_size_bytes)}")
-
-                        size_change_percentage = 0.0
-                        if original_webp_size_bytes > 0:
-                            size_change_percentage = ((
-                                                                  new_webp_size_bytes - original_webp_size_bytes) / original_webp_size_bytes) * 100
-                            print(f"    新 WebP 相对于旧 WebP 的大小改变: {size_change_percentage:.2f}%")
-                        elif new_webp_size_bytes > 0:
-                            print(f"    新 WebP 相对于旧 WebP 的大小改变: N/A (旧 WebP 大小为0)")
-                        else:
-                            print(f"    新 WebP 相对于旧 WebP 的大小改变: N/A (新旧 WebP 大小均为0)")
-                        regenerated_count += 1
-                    else:
-                        print(f"  错误: FFmpeg 从原始视频重新生成 WebP 失败 (返回码: {result.returncode})")
-                        if result.stdout: print(f"    FFmpeg 输出 (stdout):\n{result.stdout.strip()}")
-                        if result.stderr: print(f"    FFmpeg 错误 (stderr):\n{result.stderr.strip()}")
-                        failed_count += 1
-
-                except subprocess.TimeoutExpired as e_timeout:
-                    print(
-                        f"  错误: FFmpeg 从原始视频重新生成 WebP 超时 ({FFMPEG_TIMEOUT_SECONDS}s): {source_video_path}")
-                    # subprocess.TimeoutExpired.stdout/stderr are bytes, so decode them
-                    if e_timeout.stdout: print(
-                        f"    FFmpeg 输出 (stdout):\n{e_timeout.stdout.decode('utf-8', 'replace').strip()}")
-                    if e_timeout.stderr: print(
-                        f"    FFmpeg 错误 (stderr):\n{e_timeout.stderr.decode('utf-8', 'replace').strip()}")
-                    failed_count += 1
-                except Exception as e_general:
-                    print(f"  执行 FFmpeg 从原始视频重新生成 WebP 时发生意外错误: {e_general}")
-                    failed_count += 1
+    status_counts = {'scanned': 0, 'regenerated': 0, 'failed': 0, 'skipped_size': 0, 'no_source': 0}
+
+    # 遍历时即按大小过滤，只有超过阈值的 WebP 才会查找原始视频；
+    # 需要重新生成的 WebP 按原始视频分组，同一原始视频的所有输出由一次 FFmpeg 调用生成
+    jobs_by_source = {}
+    _scan_sources.cache_clear()  # 目录内容可能已在上次运行后变化
+    for webp_entry, size_bytes in _iter_webp_over_threshold(root_dir_path, size_threshold_bytes, status_counts):
+        prepared = prepare_regeneration(webp_entry, size_bytes)
+        if isinstance(prepared, RegenerationResult):
+            write_lines(prepared.messages)
+            status_counts[prepared.status] += 1
+        else:
+            jobs_by_source.setdefault(prepared.source_video, []).append(prepared)
+
+    batches = group_jobs_into_batches(jobs_by_source)
+    max_workers = max(1, min(MAX_PARALLEL_JOBS, len(batches)))
+    print(f"\n扫描了 {status_counts['scanned']} 个 .webp 文件，其中 {status_counts['skipped_size']} 个未超过阈值，"
+          f"{len(jobs_by_source)} 个原始视频需要处理，"
+          f"共 {len(batches)} 次 FFmpeg 调用，使用 {max_workers} 个并行任务。")
+
+    hwaccel = False
+    if USE_HWACCEL_DECODE and batches:
+        hwaccel_methods = detect_hwaccel_methods(ffmpeg_exe_path)
+        hwaccel = bool(hwaccel_methods)
+        if hwaccel:
+            print(f"ffmpeg 支持的 hwaccel 方法: {', '.join(hwaccel_methods)}；"
+                  f"将尝试使用 -hwaccel auto 解码原始视频（没有可用硬件时 FFmpeg 会自动使用软件解码）。")
+        else:
+            print("ffmpeg 未编译任何 hwaccel 方法，使用软件解码。")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(regenerate_batch, batch, ffmpeg_exe_path, new_fps, hwaccel)
+                   for batch in batches]
+        # 按完成顺序处理结果：任意一个 FFmpeg 结束后立即输出，不必等待排在前面的慢任务；
+        # 计数只在主线程中累加，无需加锁
+        for future in as_completed(futures):
+            # 一个批次的全部输出合并为一次写入
+            batch_lines = []
+            for result in future.result():
+                batch_lines.extend(result.messages)
+                status_counts[result.status] += 1
+            write_lines(batch_lines)
 
     print("\n--- 从原始视频重新生成 WebP 完成 ---")
-    if processed_webp_files == 0:
+    if not status_counts['scanned']:
         print("未在指定目录中找到任何 .webp 文件进行处理。")
     else:
-        print(f"总共扫描 .webp 文件: {processed_webp_files}")
-        print(f"成功重新生成: {regenerated_count} 个 WebP 文件")
-        print(f"因大小未超阈值而跳过: {skipped_size_count} 个文件")
-        print(f"因未找到对应原始视频而跳过: {no_source_found_count} 个文件")
-        print(f"重新生成失败: {failed_count} 个文件")
+        print(f"总共扫描 .webp 文件: {status_counts['scanned']}")
+        print(f"成功重新生成: {status_counts['regenerated']} 个 WebP 文件")
+        print(f"因大小未超阈值而跳过: {status_counts['skipped_size']} 个文件")
+        print(f"因未找到对应原始视频而跳过: {status_counts['no_source']} 个文件")
+        print(f"重新生成失败: {status_counts['failed']} 个文件")
 
 
 if __name__ == "__main__":
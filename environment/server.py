@@ -14,6 +14,7 @@
 - 自动参数验证和错误处理
 - 跨域支持，便于开发调试
 - 异步执行和多线程支持，确保停止命令及时响应
+- 每个连接在独立线程中处理，脚本执行期间状态查询、静态文件和停止请求不会排队
 
 使用方法:
 1. 运行此脚本: python server.py
@@ -33,16 +34,37 @@ import subprocess
 import threading
 import time
 import platform
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
+from email.feedparser import BytesFeedParser
+from email import policy as email_policy
 from pathlib import Path
 import queue
 import signal
+import socket
+import select
 import uuid
-from concurrent.futures import ThreadPoolExecutor
+import stat
+import shutil
+from collections import OrderedDict
 import asyncio
 from typing import Dict, Optional
 
+# orjson 为可选依赖：已安装时用于所有响应和流式输出的 JSON 编码（C 实现，直接返回 UTF-8 字节），
+# 未安装时回退到标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _encode_json(data, indent: bool = False) -> bytes:
+    """把数据编码为 UTF-8 JSON 字节；indent 为 True 时缩进 2 格，否则输出紧凑格式"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2) if indent else orjson.dumps(data)
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
 # 获取项目根目录（server.py现在在environment文件夹中）
 SCRIPT_DIR = Path(__file__).resolve().parent.parent
 
@@ -60,11 +82,318 @@ SCRIPT_MAPPING = {
     'test_stop_button': 'Claude/Test_stop_button.py'
 }
 
+# 启动时解析好的脚本完整路径，请求处理时直接查表，不再逐次拼接路径
+_SCRIPT_PATHS: Dict[str, Path] = {name: (SCRIPT_DIR / path).resolve() for name, path in SCRIPT_MAPPING.items()}
+
+# /api/status 的响应内容只取决于启动时的状态，预先序列化为字节
+_STATUS_RESPONSE_BYTES = _encode_json({
+    'status': 'ok',
+    'message': '小红书工具箱服务器运行正常',
+    'working_directory': str(SCRIPT_DIR),
+    'python_version': platform.python_version(),
+    'available_scripts': list(SCRIPT_MAPPING.keys())
+})
+
+# 脚本子进程的环境变量，启动时生成一次，各次执行共用
+_CHILD_ENV = {
+    **os.environ,
+    'PYTHONIOENCODING': 'utf-8',
+    'PYTHONUNBUFFERED': '1',
+    'WEBP_TOOL_SERVER_MODE': '1',  # 标识服务器模式
+}
+
+# 同时运行的脚本任务上限，超出时 /api/run-script 返回 503，避免无限制地启动子进程
+MAX_CONCURRENT_SCRIPTS = 5
+
+# 读取子进程输出时单次读取的最大字节数（同时作为管道缓冲区大小）：
+# 一次取走管道中已有的全部输出，再按换行切分，而不是逐行（逐字节查找换行）读取
+PIPE_READ_SIZE = 65536
+
+# 监控线程一次最多从输出队列中取出的数据块数：读取线程已积累的多块输出合并处理，整批只写一次 socket
+STREAM_BATCH_CHUNKS = 16
+
+# 监控线程等待输出的最长秒数，超时后检查进程是否已退出；客户端连接监视线程也按该间隔检查监控是否已结束
+STREAM_POLL_INTERVAL = 1.0
+
+# 持久连接空闲超过该秒数仍未收到下一个请求时关闭，释放处理线程
+KEEP_ALIVE_TIMEOUT = 60
+
+# 流式响应的合并发送阈值：同一块子进程输出中的多行先写入缓冲，整块处理完（或缓冲超过该大小）
+# 再一次性写入 socket，避免每行一次 write + flush
+STREAM_FLUSH_SIZE = 16384
+
+# 静态文件缓存：按路径缓存已读取的字节内容，文件修改时间或大小变化时重新读取；
+# 超过 STATIC_CACHE_SIZE 个文件时淘汰最久未使用的
+STATIC_CACHE_SIZE = 64
+# 不小于该大小的静态文件不缓存内容，发送时用 socket.sendfile 由内核直接从文件写入连接；
+# 自带的 index.html、script.js、styles.css 都远小于该值，始终从缓存的字节发送。
+# 只有系统提供 os.sendfile 时才使用（Windows 上 socket.sendfile 会退化为 Python 层的读写循环，
+# 不如直接发送缓存的字节），否则所有静态文件都缓存
+STATIC_SENDFILE_MIN_SIZE = 1024 * 1024
+_STATIC_USE_SENDFILE = hasattr(os, 'sendfile')
+_STATIC_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+_static_cache_lock = threading.Lock()
+
+# 静态文件扩展名对应的 Content-Type
+STATIC_CONTENT_TYPES = {
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.html': 'text/html; charset=utf-8',
+    '.json': 'application/json; charset=utf-8',
+}
+
 # 全局变量，用于存储当前运行的进程和任务管理
 current_processes: Dict[str, subprocess.Popen] = {}
 active_tasks: Dict[str, dict] = {}
 process_lock = threading.Lock()
-task_executor = ThreadPoolExecutor(max_workers=5)  # 创建线程池
+
+# Windows 作业对象：每个脚本进程放入一个独立的作业，终止时一次 TerminateJobObject 结束整个进程树，
+# 不再为每次终止启动 taskkill 子进程；作业设置了 KILL_ON_JOB_CLOSE，关闭句柄时残留的子进程也会被结束。
+# 通过 ctypes 调用 kernel32，不依赖 pywin32；不可用时回退到 taskkill。
+STOP_GRACE_PERIOD = 1.0  # 发送 CTRL_BREAK 后等待脚本自行退出的秒数
+
+_kernel32 = None
+if platform.system() == "Windows":
+    try:
+        import ctypes
+        from ctypes import wintypes
+        
+        class _IO_COUNTERS(ctypes.Structure):
+            _fields_ = [(name, ctypes.c_ulonglong) for name in (
+                'ReadOperationCount', 'WriteOperationCount', 'OtherOperationCount',
+                'ReadTransferCount', 'WriteTransferCount', 'OtherTransferCount')]
+        
+        class _JOBOBJECT_BASIC_LIMIT_INFORMATION(ctypes.Structure):
+            _fields_ = [
+                ('PerProcessUserTimeLimit', wintypes.LARGE_INTEGER),
+                ('PerJobUserTimeLimit', wintypes.LARGE_INTEGER),
+                ('LimitFlags', wintypes.DWORD),
+                ('MinimumWorkingSetSize', ctypes.c_size_t),
+                ('MaximumWorkingSetSize', ctypes.c_size_t),
+                ('ActiveProcessLimit', wintypes.DWORD),
+                ('Affinity', ctypes.c_size_t),
+                ('PriorityClass', wintypes.DWORD),
+                ('SchedulingClass', wintypes.DWORD),
+            ]
+        
+        class _JOBOBJECT_EXTENDED_LIMIT_INFORMATION(ctypes.Structure):
+            _fields_ = [
+                ('BasicLimitInformation', _JOBOBJECT_BASIC_LIMIT_INFORMATION),
+                ('IoInfo', _IO_COUNTERS),
+                ('ProcessMemoryLimit', ctypes.c_size_t),
+                ('JobMemoryLimit', ctypes.c_size_t),
+                ('PeakProcessMemoryUsed', ctypes.c_size_t),
+                ('PeakJobMemoryUsed', ctypes.c_size_t),
+            ]
+        
+        _JobObjectExtendedLimitInformation = 9
+        _JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE = 0x2000
+        
+        _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        _kernel32.CreateJobObjectW.argtypes = (wintypes.LPVOID, wintypes.LPCWSTR)
+        _kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+        _kernel32.SetInformationJobObject.argtypes = (wintypes.HANDLE, ctypes.c_int, wintypes.LPVOID, wintypes.DWORD)
+        _kernel32.SetInformationJobObject.restype = wintypes.BOOL
+        _kernel32.AssignProcessToJobObject.argtypes = (wintypes.HANDLE, wintypes.HANDLE)
+        _kernel32.AssignProcessToJobObject.restype = wintypes.BOOL
+        _kernel32.TerminateJobObject.argtypes = (wintypes.HANDLE, wintypes.UINT)
+        _kernel32.TerminateJobObject.restype = wintypes.BOOL
+        _kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+        _kernel32.CloseHandle.restype = wintypes.BOOL
+    except (ImportError, OSError, AttributeError):
+        _kernel32 = None
+
+# 进程 PID -> 作业对象句柄（仅 Windows）；dict 的单次 pop/赋值是原子操作，不需要额外加锁
+process_jobs: Dict[str, int] = {}
+
+def assign_process_job(process: subprocess.Popen) -> bool:
+    """为 Windows 子进程创建 KILL_ON_JOB_CLOSE 作业对象并把进程放入其中，成功返回 True"""
+    if _kernel32 is None:
+        return False
+    job = _kernel32.CreateJobObjectW(None, None)
+    if not job:
+        return False
+    limits = _JOBOBJECT_EXTENDED_LIMIT_INFORMATION()
+    limits.BasicLimitInformation.LimitFlags = _JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE
+    if (_kernel32.SetInformationJobObject(job, _JobObjectExtendedLimitInformation,
+                                          ctypes.byref(limits), ctypes.sizeof(limits))
+            and _kernel32.AssignProcessToJobObject(job, int(process._handle))):
+        process_jobs[str(process.pid)] = job
+        return True
+    _kernel32.CloseHandle(job)
+    return False
+
+def close_process_job(pid) -> None:
+    """关闭进程对应的作业句柄（作业中残留的子进程随之结束）"""
+    job = process_jobs.pop(str(pid), None)
+    if job:
+        _kernel32.CloseHandle(job)
+
+def stop_process_job(process: subprocess.Popen) -> bool:
+    """
+    通过作业对象终止 Windows 脚本进程树：先发送 CTRL_BREAK（进程以 CREATE_NEW_PROCESS_GROUP 启动），
+    等待 STOP_GRACE_PERIOD 秒后 TerminateJobObject 结束作业内的全部进程。
+    
+    返回:
+        bool: 该进程有作业对象并已终止返回 True；没有作业对象时返回 False，由调用方回退到 taskkill。
+    """
+    job = process_jobs.pop(str(process.pid), None)
+    if not job:
+        return False
+    try:
+        try:
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+            process.wait(timeout=STOP_GRACE_PERIOD)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        # 退出码 1 在监控端会显示为"被用户终止"
+        _kernel32.TerminateJobObject(job, 1)
+    finally:
+        _kernel32.CloseHandle(job)
+    try:
+        process.wait(timeout=STOP_GRACE_PERIOD)
+    except subprocess.TimeoutExpired:
+        pass
+    return True
+
+# taskkill 的完整路径在启动时解析一次，终止进程时不再每次搜索 PATH；
+# 以隐藏窗口方式启动且不继承句柄，避免弹出控制台窗口
+_TASKKILL = None
+_TASKKILL_STARTUPINFO = None
+if platform.system() == "Windows":
+    _TASKKILL = shutil.which('taskkill') or 'taskkill'
+    _TASKKILL_STARTUPINFO = subprocess.STARTUPINFO()
+    _TASKKILL_STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    _TASKKILL_STARTUPINFO.wShowWindow = subprocess.SW_HIDE
+
+def run_taskkill(pid) -> subprocess.CompletedProcess:
+    """使用 taskkill 强制终止指定 PID 的整个进程树（仅 Windows，没有作业对象时的回退方式）"""
+    return subprocess.run([_TASKKILL, '/F', '/T', '/PID', str(pid)],
+                          capture_output=True, text=True, timeout=3,
+                          close_fds=True, startupinfo=_TASKKILL_STARTUPINFO)
+
+def load_static_file(file_path: Path) -> Optional[tuple]:
+    """
+    读取静态文件内容，优先使用内存缓存（以修改时间和大小判断缓存是否有效）。
+    
+    返回:
+        (内容字节, ETag, 文件大小)；系统支持 sendfile 且文件不小于 STATIC_SENDFILE_MIN_SIZE 时
+        内容为 None（由调用方 sendfile 发送）。
+        文件不存在或不是普通文件时返回 None。
+    """
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(file_stat.st_mode):
+        return None
+    
+    cache_key = str(file_path)
+    with _static_cache_lock:
+        cached = _STATIC_CACHE.get(cache_key)
+        if cached and cached[0] == file_stat.st_mtime_ns and cached[1] == file_stat.st_size:
+            _STATIC_CACHE.move_to_end(cache_key)
+            return cached[2], cached[3], cached[1]
+    
+    # 文件本身就是 UTF-8，直接缓存字节，不再解码后重新编码
+    use_sendfile = _STATIC_USE_SENDFILE and file_stat.st_size >= STATIC_SENDFILE_MIN_SIZE
+    content = None if use_sendfile else file_path.read_bytes()
+    etag = f'W/"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+    with _static_cache_lock:
+        _STATIC_CACHE[cache_key] = (file_stat.st_mtime_ns, file_stat.st_size, content, etag)
+        _STATIC_CACHE.move_to_end(cache_key)
+        while len(_STATIC_CACHE) > STATIC_CACHE_SIZE:
+            _STATIC_CACHE.popitem(last=False)
+    return content, etag, file_stat.st_size
+
+def _encode_stream_record(data: dict) -> bytes:
+    """把一条流式消息编码为一行紧凑的 UTF-8 JSON（以换行结尾）"""
+    return _encode_json(data) + b'\n'
+
+def _pump_pipe(pipe, tag: str, output_queue: "queue.Queue") -> None:
+    """
+    在独立线程中读取子进程的一个输出管道，把 (标签, 数据块) 放入队列，读到 EOF 时放入 (标签, None)。
+    
+    Windows 上 selectors 不能等待管道句柄，因此 stdout 和 stderr 各用一个线程阻塞读取，
+    两个流互不阻塞：一个流写入大量内容时不会因为另一个流没有被读取而卡住。
+    """
+    try:
+        fd = pipe.fileno()
+        while True:
+            chunk = os.read(fd, PIPE_READ_SIZE)
+            if not chunk:
+                break
+            output_queue.put((tag, chunk))
+    except (OSError, ValueError) as e:
+        # 终止进程时管道可能已被关闭
+        print(f"[DEBUG] 读取{tag}管道结束: {e}")
+    finally:
+        output_queue.put((tag, None))
+
+# webp_video 的 overwrite 参数取这些值（不区分大小写）时表示覆盖已有文件
+_TRUTHY = frozenset({'true', 'y', 'yes', '1', 'replace_all'})
+
+def _lines_input(*lines) -> bytes:
+    """把多行输入拼接为脚本的标准输入内容（UTF-8 字节）"""
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+def _build_webp_video_args(params: dict) -> tuple:
+    """webp_video 不读取标准输入，参数通过命令行传递"""
+    overwrite_value = params.get('overwrite', 'false')  # 默认为 'false'
+    
+    # 转换 overwrite 参数为脚本期望的命令行选项值
+    if isinstance(overwrite_value, bool):
+        actual_overwrite_mode = 'replace_all' if overwrite_value else 'skip'
+    elif isinstance(overwrite_value, str) and overwrite_value.lower() in _TRUTHY:
+        actual_overwrite_mode = 'replace_all'
+    else:
+        actual_overwrite_mode = 'skip'  # 默认跳过
+    
+    # 第一个参数是必须的 root_folder，后续是可选参数 --overwrite 和 --duration
+    prepared_args = [
+        str(params.get('path')),  # root_folder
+        '--overwrite', actual_overwrite_mode,
+        '--duration', str(params.get('duration', '3'))
+    ]
+    return b'', prepared_args  # 没有标准输入，只有命令行参数
+
+# 各脚本的输入构造函数：返回标准输入字节，或 (标准输入字节, 命令行参数) 元组；
+# 不在表中的脚本（如 test_stop_button）不需要输入
+_INPUT_BUILDERS = {
+    'build_folder': lambda p: _lines_input(p.get('path', ''), str(p.get('count', 5))),
+    'rename_files': lambda p: _lines_input(p.get('path', '')),
+    'webp_video': _build_webp_video_args,
+    'copy_files': lambda p: _lines_input(p.get('source_path', ''), p.get('target_path', '')),
+    'unzip': lambda p: _lines_input(p.get('path', ''), 'y' if p.get('overwrite', False) else 'n'),
+    'md5_renew': lambda p: _lines_input(p.get('path', ''), str(p.get('bytes', 10))),
+    'auto_build_copy': lambda p: _lines_input(p.get('base_path', ''), str(p.get('count', 5)),
+                                              p.get('source_path', '')),
+    'webp_resize': lambda p: _lines_input(p.get('path', ''),
+                                          str(p.get('size_threshold', 10)),  # 默认10MB
+                                          str(p.get('fps', 15))),  # 默认15fps
+    'excel_renew': lambda p: _lines_input(p.get('path', '')),
+}
+
+def _watch_client_close(sock: socket.socket, output_queue: "queue.Queue", done: threading.Event) -> None:
+    """
+    在独立线程中等待流式响应的客户端断开连接，断开时向输出队列放入 ('closed', None)。
+    
+    请求体已经读完，客户端不会再发送数据，连接变为可读即表示收到了 FIN（读到 0 字节）或 RST（读取报错），
+    监控线程可以立即终止脚本，不需要发送心跳探测。select 在 Windows 上同样支持 socket。
+    """
+    try:
+        while not done.is_set():
+            readable, _, _ = select.select([sock], [], [], STREAM_POLL_INTERVAL)
+            if readable:
+                if sock.recv(1, socket.MSG_PEEK):
+                    # 客户端发送了多余的数据，不再监视
+                    return
+                break
+    except (OSError, ValueError):
+        # 连接被重置，或监控结束后连接已关闭
+        pass
+    if not done.is_set():
+        output_queue.put(('closed', None))
 
 class ToolboxRequestHandler(BaseHTTPRequestHandler):
     """
@@ -77,8 +406,13 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
     - GET /environment/*: 提供静态文件（CSS、JS等）
     
     所有响应都支持跨域访问，便于开发调试。
+    使用 HTTP/1.1 持久连接：状态查询、静态文件等普通响应都带 Content-Length，连接可复用；
+    脚本执行的流式响应使用 chunked 编码并在结束后关闭连接。
     """
     
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEP_ALIVE_TIMEOUT
+    
     def do_GET(self):
         """处理GET请求"""
         parsed_path = urlparse(self.path)
@@ -100,7 +434,11 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
         
         if parsed_path.path == '/api/run-script':
             self._handle_run_script()
-        elif parsed_path.path == '/api/stop-script':
+            return
+        
+        # 其余接口不使用请求体，先读掉，连接上的下一个请求才能正确解析
+        self._discard_request_body()
+        if parsed_path.path == '/api/stop-script':
             self._handle_stop_script()
         elif parsed_path.path == '/api/restart-server':
             self._handle_restart_server()
@@ -112,15 +450,7 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
     def _handle_status(self):
         """处理状态查询请求"""
         try:
-            status_data = {
-                'status': 'ok',
-                'message': '小红书工具箱服务器运行正常',
-                'working_directory': str(SCRIPT_DIR),
-                'python_version': platform.python_version(),
-                'available_scripts': list(SCRIPT_MAPPING.keys())
-            }
-            
-            self._send_json_response(status_data)
+            self._send_json_bytes(_STATUS_RESPONSE_BYTES)
             
         except Exception as e:
             self._send_error_response(f"处理脚本执行请求失败: {str(e)}")
@@ -149,8 +479,9 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
                     'process_count': len(current_processes),
                     'total_tasks': len(active_tasks)
                 }
-                
-                self._send_json_response(response_data)
+            
+            # 任务列表会被前端轮询，使用紧凑格式；在锁外发送，不阻塞脚本启动和停止
+            self._send_json_response(response_data, indent=False)
                 
         except Exception as e:
             self._send_error_response(f"获取任务列表失败: {str(e)}")
@@ -171,11 +502,14 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
                             print(f"正在强制终止进程 PID: {pid}")
                             
                             try:
-                                if platform.system() == "Windows":
-                                    # Windows系统：直接使用强制终止
+                                if platform.system() == "Windows" and stop_process_job(process):
+                                    # Windows系统：通过作业对象终止整个进程树
+                                    print(f"进程树已通过作业对象终止 PID: {pid}")
+                                    stopped_processes.append(pid)
+                                elif platform.system() == "Windows":
+                                    # 没有作业对象时使用taskkill强制终止
                                     print(f"使用taskkill强制终止进程树 PID: {pid}")
-                                    result = subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)], 
-                                                          capture_output=True, text=True, timeout=3)
+                                    result = run_taskkill(pid)
                                     if result.returncode == 0:
                                         print(f"进程树已强制终止 PID: {pid}")
                                         stopped_processes.append(pid)
@@ -258,8 +592,7 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
             def delayed_shutdown():
                 import time
                 time.sleep(1)  # 等待1秒确保响应发送完成
-                global server_should_exit
-                server_should_exit = True
+                server_stop_event.set()
                 print("服务器正在关闭...")
             
             shutdown_thread = threading.Thread(target=delayed_shutdown)
@@ -272,56 +605,35 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
     def _handle_run_script(self):
         """处理脚本执行请求 - 异步版本"""
         try:
-            # 读取请求数据
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            
-            # 解析FormData
-            import cgi
-            from io import BytesIO
-            
-            # 创建一个模拟的文件对象
-            fp = BytesIO(post_data)
-            
-            # 解析multipart/form-data
-            form = cgi.FieldStorage(
-                fp=fp,
-                headers=self.headers,
-                environ={'REQUEST_METHOD': 'POST'}
-            )
-            
-            # 获取脚本名称
-            script_name = form.getvalue('script')
-            
-            # 获取所有参数
-            params = {}
-            for key in form.keys():
-                if key != 'script':
-                    params[key] = form.getvalue(key)
+            # 解析表单数据，获取脚本名称和其余参数
+            params = self._parse_form_data()
+            script_name = params.pop('script', None)
             
             # 验证脚本名称
-            if not script_name or script_name not in SCRIPT_MAPPING:
+            if not script_name or script_name not in _SCRIPT_PATHS:
                 self._send_error_response(f"无效的脚本名称: {script_name}")
                 return
             
-            # 获取脚本文件路径
-            script_file = SCRIPT_DIR / SCRIPT_MAPPING[script_name]
-            
-            if not script_file.exists():
-                self._send_error_response(f"脚本文件不存在: {script_file}")
-                return
+            # 获取脚本文件路径（是否存在已在启动时由 check_dependencies 检查）
+            script_file = _SCRIPT_PATHS[script_name]
             
             # 生成任务ID
             task_id = str(uuid.uuid4())[:8]
             
-            # 记录任务信息
+            # 记录任务信息（检查并发上限与登记任务在同一把锁内完成）
             with process_lock:
-                active_tasks[task_id] = {
-                    'script_name': script_name,
-                    'params': params,
-                    'start_time': time.time(),
-                    'status': 'starting'
-                }
+                server_busy = len(active_tasks) >= MAX_CONCURRENT_SCRIPTS
+                if not server_busy:
+                    active_tasks[task_id] = {
+                        'script_name': script_name,
+                        'params': params,
+                        'start_time': time.time(),
+                        'status': 'starting'
+                    }
+            if server_busy:
+                self._send_error_response(
+                    f"当前已有 {MAX_CONCURRENT_SCRIPTS} 个脚本在运行，请稍后再试", 503)
+                return
             
             # 设置响应头（立即开始流式响应）
             self.send_response(200)
@@ -330,31 +642,61 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
             self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
             self.send_header('Access-Control-Allow-Headers', 'Content-Type')
             self.send_header('Transfer-Encoding', 'chunked')
+            self.send_header('Connection', 'close')
             self.end_headers()
             
             # 发送任务开始信息
             self._send_stream_data({
                 'type': 'output',
-                'content': f"=== 任务开始 [{task_id}] {Path(SCRIPT_MAPPING[script_name]).name} ==="
+                'content': f"=== 任务开始 [{task_id}] {script_file.name} ==="
             })
             
-            # 在线程池中异步执行脚本
-            future = task_executor.submit(
-                self._execute_script_async, 
-                script_file, 
-                script_name, 
-                params, 
-                task_id
-            )
-            
-            # 在主线程中监控执行状态并发送实时输出
-            self._monitor_script_execution(future, task_id)
+            # 在当前连接的处理线程中直接启动脚本，再监控执行状态并发送实时输出
+            # （每个连接本身就在独立线程中，不需要再转交给线程池）
+            result = self._start_script_process(script_file, script_name, params, task_id)
+            self._monitor_script_execution(result, task_id)
+            self._end_stream()
             
         except Exception as e:
             self._send_stream_error(f"处理请求失败: {str(e)}")
     
-    def _execute_script_async(self, script_file: Path, script_name: str, params: dict, task_id: str):
-        """在独立线程中异步执行Python脚本"""
+    def _parse_form_data(self) -> dict:
+        """
+        读取并解析 POST 请求体，返回 {字段名: 字符串值}。
+        
+        multipart/form-data 交给标准库 email 的 BytesFeedParser 解析（替代已弃用的 cgi 模块），
+        请求体按 PIPE_READ_SIZE 分块从连接读出后直接送入解析器，不先拼接成完整的字节串；
+        application/x-www-form-urlencoded 用 parse_qs 解析；同名字段只保留第一个值。
+        """
+        content_length = int(self.headers.get('Content-Length') or 0)
+        content_type = self.headers.get('Content-Type', '')
+        
+        fields = {}
+        if content_type.startswith('multipart/'):
+            # 补上 Content-Type 头，把请求体当作一封 MIME 邮件解析
+            parser = BytesFeedParser(policy=email_policy.HTTP)
+            parser.feed(b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n')
+            remaining = content_length
+            while remaining > 0:
+                chunk = self.rfile.read(min(remaining, PIPE_READ_SIZE))
+                if not chunk:
+                    break
+                parser.feed(chunk)
+                remaining -= len(chunk)
+            message = parser.close()
+            for part in message.iter_parts():
+                name = part.get_param('name', header='content-disposition')
+                if name and name not in fields:
+                    payload = part.get_payload(decode=True) or b''
+                    fields[name] = payload.decode(part.get_content_charset() or 'utf-8', 'replace')
+        else:
+            post_data = self.rfile.read(content_length)
+            for name, values in parse_qs(post_data.decode('utf-8', 'replace')).items():
+                fields[name] = values[0]
+        return fields
+    
+    def _start_script_process(self, script_file: Path, script_name: str, params: dict, task_id: str):
+        """启动Python脚本子进程，返回进程对象供监控使用；启动失败时返回错误信息"""
         global current_processes
         
         try:
@@ -375,70 +717,54 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
                 script_input = script_input_result
                 cmd = [sys.executable, '-u', str(script_file)]
                 print(f"[DEBUG] 使用标准输入模式: {cmd}")
-                print(f"[DEBUG] 标准输入内容: {repr(script_input)}")
-            
-            # 设置环境变量
-            env = os.environ.copy()
-            env['PYTHONIOENCODING'] = 'utf-8'
-            env['PYTHONUNBUFFERED'] = '1'
-            env['WEBP_TOOL_SERVER_MODE'] = '1'  # 标识服务器模式
+                print(f"[DEBUG] 标准输入内容: {script_input.decode('utf-8')!r}")
             
             script_cwd = script_file.parent
+            # 管道以二进制模式打开，输出由监控线程按行解码；没有输入时不创建 stdin 管道，脚本读取时直接得到 EOF
+            stdin_mode = subprocess.PIPE if script_input else subprocess.DEVNULL
             
             # 根据操作系统设置进程创建参数
             if platform.system() == "Windows":
                 process = subprocess.Popen(
                     cmd,
-                    stdin=subprocess.PIPE,
+                    stdin=stdin_mode,
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace',
+                    stderr=subprocess.PIPE,
                     cwd=str(script_cwd),
-                    bufsize=0,  # 无缓冲
-                    universal_newlines=True,
-                    env=env,
+                    bufsize=PIPE_READ_SIZE,
+                    env=_CHILD_ENV,
                     creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
                 )
             else:
                 process = subprocess.Popen(
                     cmd,
-                    stdin=subprocess.PIPE,
+                    stdin=stdin_mode,
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace',
+                    stderr=subprocess.PIPE,
                     cwd=str(script_cwd),
-                    bufsize=0,  # 无缓冲
-                    universal_newlines=True,
-                    env=env,
+                    bufsize=PIPE_READ_SIZE,
+                    env=_CHILD_ENV,
                     preexec_fn=os.setsid
                 )
             
+            # Windows：放入独立的作业对象，终止时可一次结束整个进程树
+            if platform.system() == "Windows" and not assign_process_job(process):
+                print(f"[DEBUG] 创建作业对象失败，终止时将使用taskkill PID: {process.pid}")
+            
             # 存储进程引用
             with process_lock:
                 current_processes[str(process.pid)] = process
             
             print(f"[DEBUG] 脚本进程已启动，PID: {process.pid}")
             
-            # 发送输入到脚本
+            # 发送输入到脚本，写完立即关闭 stdin，避免脚本等待更多输入
             if script_input:
                 try:
                     process.stdin.write(script_input)
-                    process.stdin.flush()
                     process.stdin.close()
                     print(f"[DEBUG] 已发送输入到脚本")
                 except Exception as e:
                     print(f"[DEBUG] 发送输入到脚本失败: {str(e)}")
-            else:
-                # 如果没有输入，也关闭stdin避免脚本等待
-                try:
-                    process.stdin.close()
-                    print(f"[DEBUG] 已关闭stdin（无输入）")
-                except Exception as e:
-                    print(f"[DEBUG] 关闭stdin失败: {str(e)}")
             
             # 使用实时输出读取 - 直接返回进程对象供监控使用
             return {
@@ -462,16 +788,13 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
                 'task_id': task_id
             }
     
-    def _monitor_script_execution(self, future, task_id: str):
+    def _monitor_script_execution(self, result: dict, task_id: str):
         """监控脚本执行状态并发送实时输出"""
         process = None
+        monitor_done = threading.Event()
         try:
-            # 等待脚本启动
             print(f"[DEBUG] 开始监控任务 {task_id}")
             
-            # 获取执行结果
-            result = future.result(timeout=10.0)  # 等待脚本启动
-            
             if 'error' in result:
                 self._send_stream_data({
                     'type': 'error',
@@ -484,9 +807,20 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
             
             print(f"[DEBUG] 获取到进程对象，开始实时读取输出，PID: {process.pid}")
             
-            # 实时读取输出并发送
+            # 实时读取输出并发送：stdout 和 stderr 分别由读取线程放入同一个队列，
+            # stdout 的内容以 'output' 发送，stderr 的内容以 'error' 发送
             output_count = 0
             connection_broken = False
+            output_queue: "queue.Queue" = queue.Queue()
+            # 每个流中不完整的最后一行留在各自的缓冲里，等下一块数据到达后再发送
+            pending_output = {'output': bytearray(), 'error': bytearray()}
+            for pipe, tag in ((process.stdout, 'output'), (process.stderr, 'error')):
+                threading.Thread(target=_pump_pipe, args=(pipe, tag, output_queue),
+                                 name=f"pipe-{tag}-{process.pid}", daemon=True).start()
+            open_streams = len(pending_output)
+            # 客户端断开连接时由监视线程放入 ('closed', None)
+            threading.Thread(target=_watch_client_close, args=(self.connection, output_queue, monitor_done),
+                             name=f"client-watch-{process.pid}", daemon=True).start()
             
             while True:
                 # *** 第一优先级：检查连接是否已断开 ***
@@ -495,55 +829,60 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
                     self._terminate_process(process, f"连接断开，强制终止任务 {task_id}")
                     break
                 
-                # 检查进程是否仍在运行
-                if process.poll() is not None:
-                    # 进程已结束，读取剩余输出
-                    remaining_output = process.stdout.read()
-                    if remaining_output and not connection_broken:
-                        for line in remaining_output.splitlines():
-                            if line.strip():
-                                try:
-                                    self._send_stream_data({
-                                        'type': 'output',
-                                        'content': line.strip()
-                                    })
-                                    output_count += 1
-                                except Exception as e:
-                                    print(f"[DEBUG] 发送剩余输出失败，连接已断开: {e}")
-                                    connection_broken = True
-                                    break
+                if open_streams == 0 and process.poll() is not None:
+                    # 两个流都已读完且进程已结束
                     break
                 
-                # 读取一行输出
+                # 读取一块输出
                 try:
-                    output_line = process.stdout.readline()
-                    if output_line:
-                        output_count += 1
+                    try:
+                        batch = [output_queue.get(timeout=STREAM_POLL_INTERVAL)]
+                    except queue.Empty:
+                        # 一段时间没有输出，回到循环开头检查进程是否已退出
+                        continue
+                    # 读取线程已经放入队列的其余数据块一并取出
+                    while len(batch) < STREAM_BATCH_CHUNKS:
                         try:
-                            self._send_stream_data({
-                                'type': 'output',
-                                'content': output_line.rstrip()
-                            })
-                            print(f"[DEBUG] 发送输出行 {output_count}: {output_line.rstrip()[:50]}...")
-                        except Exception as send_error:
-                            print(f"[DEBUG] 发送数据失败，连接断开，设置断开标记: {send_error}")
-                            connection_broken = True
-                            # 不要continue，让下次循环开始时检查connection_broken状态
-                    elif not output_line:
-                        # 没有更多输出，测试连接状态
-                        if not connection_broken:
-                            try:
-                                # 发送一个心跳测试连接
-                                self._send_stream_data({
-                                    'type': 'ping',
-                                    'content': ''
-                                })
-                            except Exception as ping_error:
-                                print(f"[DEBUG] 心跳检测失败，连接已断开: {ping_error}")
+                            batch.append(output_queue.get_nowait())
+                        except queue.Empty:
+                            break
+                    
+                    try:
+                        batch_count = output_count
+                        for tag, output_chunk in batch:
+                            if tag == 'closed':
+                                print(f"[DEBUG] 客户端已断开连接，任务 {task_id}")
                                 connection_broken = True
-                        
-                        # 没有更多输出，稍等片刻
-                        time.sleep(0.1)
+                                break
+                            pending = pending_output[tag]
+                            if output_chunk:
+                                pending += output_chunk
+                                line_end = pending.rfind(b'\n')
+                                if line_end < 0:
+                                    continue
+                                complete_lines = bytes(pending[:line_end])
+                                del pending[:line_end + 1]
+                            else:
+                                # 该流已结束，最后一行可能没有换行符
+                                open_streams -= 1
+                                if not pending:
+                                    continue
+                                complete_lines = bytes(pending)
+                                pending.clear()
+                            
+                            for output_line in complete_lines.decode('utf-8', 'replace').split('\n'):
+                                output_count += 1
+                                self._send_stream_data({
+                                    'type': tag,
+                                    'content': output_line.rstrip()
+                                }, flush=False)
+                        if output_count > batch_count:
+                            self._flush_stream()
+                            print(f"[DEBUG] 已发送输出 {output_count} 行: {output_line.rstrip()[:50]}...")
+                    except Exception as send_error:
+                        print(f"[DEBUG] 发送数据失败，连接断开，设置断开标记: {send_error}")
+                        connection_broken = True
+                        # 不要continue，让下次循环开始时检查connection_broken状态
                 except Exception as e:
                     print(f"[DEBUG] 读取输出时出错: {e}")
                     if not connection_broken:
@@ -569,7 +908,8 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
                 return_code = -1
                 print(f"[DEBUG] 脚本被强制终止，总输出行数: {output_count}")
             
-            # 清理进程引用
+            # 清理进程引用（关闭作业句柄，脚本残留的子进程随之结束）
+            close_process_job(process.pid)
             with process_lock:
                 current_processes.pop(str(process.pid), None)
                 if task_id in active_tasks:
@@ -620,111 +960,64 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
             except:
                 print(f"[DEBUG] 无法发送错误信息，连接可能已断开")
         finally:
+            monitor_done.set()
             # 清理任务记录
             with process_lock:
                 active_tasks.pop(task_id, None)
             print(f"[DEBUG] 任务 {task_id} 监控结束")
     
-    def _prepare_script_input(self, script_name: str, params: dict) -> str:
-        """根据脚本类型和参数准备输入数据"""
-        inputs = []
+    def _prepare_script_input(self, script_name: str, params: dict):
+        """根据脚本类型和参数准备输入数据（已编码的字节，或 (字节, 命令行参数) 元组）"""
+        builder = _INPUT_BUILDERS.get(script_name)
+        return builder(params) if builder else b''
+    
+    def _send_stream_data(self, data: dict, flush: bool = True):
+        """
+        发送流式数据
         
-        if script_name == 'build_folder':
-            inputs.append(params.get('path', ''))
-            inputs.append(str(params.get('count', 5)))
-            
-        elif script_name == 'rename_files':
-            inputs.append(params.get('path', ''))
-            
-        elif script_name == 'webp_video':
-            folder_path = params.get('path')  # 修正参数名称
-            overwrite_value = params.get('overwrite', 'false') # 默认为 'false'
-            duration_value = params.get('duration', '3')
-
-            # 转换 overwrite 参数为脚本期望的命令行选项值
-            if isinstance(overwrite_value, bool):
-                actual_overwrite_mode = 'replace_all' if overwrite_value else 'skip'
-            elif isinstance(overwrite_value, str):
-                if overwrite_value.lower() in ['true', 'y', 'yes', '1', 'replace_all']:
-                    actual_overwrite_mode = 'replace_all'
-                else:
-                    actual_overwrite_mode = 'skip'
-            else:
-                actual_overwrite_mode = 'skip' # 默认跳过
-
-            # 准备命令行参数
-            # 第一个参数是必须的 root_folder
-            # 后续是可选参数 --overwrite 和 --duration
-            prepared_args = [
-                str(folder_path), # root_folder
-                '--overwrite', str(actual_overwrite_mode),
-                '--duration', str(duration_value)
-            ]
-            return [], prepared_args # 没有标准输入，只有命令行参数
-                
-        elif script_name == 'copy_files':
-            inputs.append(params.get('source_path', ''))
-            inputs.append(params.get('target_path', ''))
-            
-        elif script_name == 'unzip':
-            inputs.append(params.get('path', ''))
-            if params.get('overwrite', False):
-                inputs.append('y')
-            else:
-                inputs.append('n')
-                
-        elif script_name == 'md5_renew':
-            inputs.append(params.get('path', ''))
-            inputs.append(str(params.get('bytes', 10)))
-            
-        elif script_name == 'auto_build_copy':
-            inputs.append(params.get('base_path', ''))
-            inputs.append(str(params.get('count', 5)))
-            inputs.append(params.get('source_path', ''))
+        flush 为 False 时只写入发送缓冲（超过 STREAM_FLUSH_SIZE 时自动发送），
+        由调用方在一批数据写完后调用 _flush_stream 一次性发送。
+        """
+        try:
+            data_bytes = _encode_stream_record(data)
             
-        elif script_name == 'webp_resize':
-            inputs.append(params.get('path', ''))
-            inputs.append(str(params.get('size_threshold', 10)))  # 默认10MB
-            inputs.append(str(params.get('fps', 15)))  # 默认15fps
+            stream_buffer = self.__dict__.setdefault('_stream_buffer', bytearray())
+            # chunk大小（十六进制） + 数据
+            stream_buffer += b'%x\r\n' % len(data_bytes)
+            stream_buffer += data_bytes
+            stream_buffer += b'\r\n'
             
-        elif script_name == 'excel_renew':
-            inputs.append(params.get('path', ''))
+            if flush or len(stream_buffer) >= STREAM_FLUSH_SIZE:
+                self._flush_stream()
             
-        # 添加换行符
-        return '\n'.join(inputs) + '\n' if inputs else ''
+        except Exception as e:
+            print(f"发送流式数据失败: {e}")
     
-    def _send_stream_data(self, data: dict):
-        """发送流式数据"""
+    def _flush_stream(self):
+        """把发送缓冲中已编码的 chunk 一次性写入连接"""
+        stream_buffer = self.__dict__.get('_stream_buffer')
+        if not stream_buffer:
+            return
         try:
-            json_data = json.dumps(data, ensure_ascii=False) + '\n'
-            data_bytes = json_data.encode('utf-8')
-            
-            # 发送chunk大小（十六进制）
-            chunk_size = hex(len(data_bytes))[2:].encode('ascii')
-            self.wfile.write(chunk_size + b'\r\n')
-            
-            # 发送数据
-            self.wfile.write(data_bytes + b'\r\n')
+            self.wfile.write(stream_buffer)
             self.wfile.flush()
-            
+        except Exception as e:
+            print(f"发送流式数据失败: {e}")
+        finally:
+            stream_buffer.clear()
+    
+    def _end_stream(self):
+        """发送缓冲中剩余的数据和结束 chunk，客户端据此判断流式响应已完整结束"""
+        self._flush_stream()
+        try:
+            self.wfile.write(b'0\r\n\r\n')
         except Exception as e:
             print(f"发送流式数据失败: {e}")
     
     def _serve_index_html(self):
         """提供主页面"""
         try:
-            index_file = SCRIPT_DIR / 'index.html'
-            if index_file.exists():
-                with open(index_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                self.send_response(200)
-                self.send_header('Content-Type', 'text/html; charset=utf-8')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(content.encode('utf-8'))
-            else:
-                self._send_404()
+            self._send_static_file(SCRIPT_DIR / 'index.html', 'text/html; charset=utf-8')
         except Exception as e:
             self._send_error_response(f"读取主页面失败: {str(e)}")
     
@@ -735,44 +1028,62 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
             relative_path = path.lstrip('/')
             static_file = SCRIPT_DIR / relative_path
             
-            if static_file.exists() and static_file.is_file():
-                # 根据文件扩展名确定Content-Type
-                content_type = 'text/plain'
-                if path.endswith('.css'):
-                    content_type = 'text/css; charset=utf-8'
-                elif path.endswith('.js'):
-                    content_type = 'application/javascript; charset=utf-8'
-                elif path.endswith('.html'):
-                    content_type = 'text/html; charset=utf-8'
-                elif path.endswith('.json'):
-                    content_type = 'application/json; charset=utf-8'
-                
-                with open(static_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                self.send_response(200)
-                self.send_header('Content-Type', content_type)
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(content.encode('utf-8'))
-            else:
-                self._send_404()
+            # 根据文件扩展名确定Content-Type
+            content_type = STATIC_CONTENT_TYPES.get(static_file.suffix.lower(), 'text/plain')
+            self._send_static_file(static_file, content_type)
         except Exception as e:
             self._send_error_response(f"读取静态文件失败: {str(e)}")
     
-    def _send_json_response(self, data: dict, status_code: int = 200):
-        """发送JSON响应"""
+    def _send_static_file(self, file_path: Path, content_type: str):
+        """发送静态文件；浏览器缓存的 ETag 仍然有效时返回 304，不再发送内容"""
+        loaded = load_static_file(file_path)
+        if loaded is None:
+            self._send_404()
+            return
+        content, etag, size = loaded
+        
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(size))
+        self.send_header('ETag', etag)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        
+        if content is not None:
+            self.wfile.write(content)
+        else:
+            # 响应头已写出（wfile 无缓冲），文件内容由内核直接发送到连接，不经过 Python 缓冲区；
+            # 按 Content-Length 限定发送字节数，文件在此期间被修改也不会多发
+            self.wfile.flush()
+            with open(file_path, 'rb') as f:
+                self.connection.sendfile(f, 0, size)
+    
+    def _send_json_response(self, data: dict, status_code: int = 200, indent: bool = True):
+        """发送JSON响应（默认缩进，便于直接在浏览器中查看）"""
+        try:
+            self._send_json_bytes(_encode_json(data, indent), status_code)
+        except Exception as e:
+            print(f"发送JSON响应失败: {e}")
+    
+    def _send_json_bytes(self, body: bytes, status_code: int = 200):
+        """发送已序列化好的JSON响应体"""
         try:
-            json_data = json.dumps(data, ensure_ascii=False, indent=2)
-            
             self.send_response(status_code)
             self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
             self.send_header('Access-Control-Allow-Origin', '*')
             self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
             self.send_header('Access-Control-Allow-Headers', 'Content-Type')
             self.end_headers()
             
-            self.wfile.write(json_data.encode('utf-8'))
+            self.wfile.write(body)
         except Exception as e:
             print(f"发送JSON响应失败: {e}")
     
@@ -786,6 +1097,7 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
             self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
             self.send_header('Access-Control-Allow-Headers', 'Content-Type')
             self.send_header('Transfer-Encoding', 'chunked')
+            self.send_header('Connection', 'close')
             self.end_headers()
             
             # 发送错误信息
@@ -793,6 +1105,7 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
                 'type': 'error',
                 'content': message
             })
+            self._end_stream()
         except Exception as e:
             print(f"发送流式错误响应失败: {e}")
     
@@ -807,10 +1120,18 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
     
     def _send_404(self):
         """发送404响应"""
+        body = '404 Not Found'.encode('utf-8')
         self.send_response(404)
         self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write('404 Not Found'.encode('utf-8'))
+        self.wfile.write(body)
+    
+    def _discard_request_body(self):
+        """读取并丢弃未使用的请求体"""
+        content_length = int(self.headers.get('Content-Length') or 0)
+        if content_length > 0:
+            self.rfile.read(content_length)
     
     def do_OPTIONS(self):
         """处理OPTIONS请求（CORS预检）"""
@@ -818,6 +1139,7 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def log_message(self, format, *args):
@@ -831,12 +1153,14 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
             if process and process.poll() is None:
                 print(f"[DEBUG] {reason}，正在终止进程 PID: {process.pid}")
                 
-                if platform.system() == "Windows":
-                    # Windows系统：直接使用强制终止，不再尝试优雅终止
+                if platform.system() == "Windows" and stop_process_job(process):
+                    # Windows系统：通过作业对象终止整个进程树
+                    print(f"[DEBUG] 进程树已通过作业对象终止 PID: {process.pid}")
+                elif platform.system() == "Windows":
+                    # 没有作业对象时直接使用taskkill强制终止
                     try:
                         print(f"[DEBUG] 立即强制终止进程树 PID: {process.pid}")
-                        result = subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)], 
-                                              capture_output=True, text=True, timeout=3)
+                        result = run_taskkill(process.pid)
                         if result.returncode == 0:
                             print(f"[DEBUG] 进程树已强制终止 PID: {process.pid}")
                         else:
@@ -877,15 +1201,14 @@ class ToolboxRequestHandler(BaseHTTPRequestHandler):
             except:
                 pass
 
-# 全局退出标志
-server_should_exit = False
+# 停止事件：收到退出信号或停止请求时设置，主线程随即关闭服务器
+server_stop_event = threading.Event()
 
 def signal_handler(signum, frame):
     """信号处理函数，用于优雅退出"""
-    global server_should_exit
     print("\n\n=== 收到退出信号，正在关闭服务器... ===")
     print("感谢使用小红书工具箱！")
-    server_should_exit = True
+    server_stop_event.set()
 
 def check_dependencies():
     """检查依赖的脚本文件是否存在"""
@@ -893,8 +1216,7 @@ def check_dependencies():
     missing_files = []
     
     for script_key, script_file in SCRIPT_MAPPING.items():
-        file_path = SCRIPT_DIR / script_file
-        if file_path.exists():
+        if _SCRIPT_PATHS[script_key].is_file():
             print(f"✅ {script_file}")
         else:
             print(f"❌ {script_file} (缺失)")
@@ -932,8 +1254,12 @@ def main():
     PORT = 8000
     
     try:
-        # 创建HTTP服务器
-        server = HTTPServer((HOST, PORT), ToolboxRequestHandler)
+        # 创建HTTP服务器：每个连接在独立的守护线程中处理，
+        # 长时间运行的脚本请求不会阻塞状态查询、静态文件和停止请求
+        server = ThreadingHTTPServer((HOST, PORT), ToolboxRequestHandler)
+        server.daemon_threads = True
+        # 增大发送缓冲区（新连接会继承），脚本输出较多时合并后的大块数据可以一次写入
+        server.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
         
         print(f"🚀 服务器启动成功!")
         print(f"📡 服务地址: http://{HOST}:{PORT}")
@@ -948,19 +1274,18 @@ def main():
         print("="*60)
         print()
         
-        # 启动服务器
-        # 使用循环检查退出标志，而不是直接serve_forever()
-        while not server_should_exit:
-            try:
-                server.handle_request()
-            except KeyboardInterrupt:
-                break
-            except Exception as e:
-                if not server_should_exit:
-                    print(f"处理请求时发生错误: {e}")
-        
-        # 关闭服务器
-        server.server_close()
+        # 启动服务器：serve_forever 在后台线程中运行，主线程等待停止事件
+        server_thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.5},
+                                         name='http-server', daemon=True)
+        server_thread.start()
+        try:
+            # 分段等待而不是无限期阻塞，Windows 上 Ctrl+C 的信号处理函数才能及时执行
+            while not server_stop_event.wait(0.5):
+                pass
+        finally:
+            # 关闭服务器（shutdown 需要在 serve_forever 以外的线程调用）
+            server.shutdown()
+            server.server_close()
         
     except OSError as e:
         if e.errno == 10048:  # Windows: Address already in use